@@ -0,0 +1,222 @@
+import csv
+import os
+import sqlite3
+import sys
+
+RUTA_ALMACEN = "leads.db"
+RUTA_EXCEL = "leads_contactos.xlsx"
+# Filas leídas del almacén y escritas en el fichero de exportación por tanda
+FILAS_POR_TANDA = 5000
+
+COLUMNAS = [
+    "Empresa/Entidad",
+    "Enlace",
+    "Teléfono",
+    "Email",
+    "Dirección",
+    "País",
+    "Sector",
+    "WhatsApp",
+    "Fecha Extracción"
+]
+
+CAMPOS = ("empresa", "enlace", "telefono", "email", "direccion", "pais", "sector", "whatsapp", "fecha")
+
+# Leads únicos por teléfono y email, el primero que se encontró de cada uno
+CONSULTA_UNICOS = (
+    "SELECT empresa, enlace, telefono, email, direccion, pais, sector, whatsapp, fecha FROM leads "
+    "WHERE id IN (SELECT MIN(id) FROM leads GROUP BY telefono, email) ORDER BY id"
+)
+
+
+class Lead:
+    """Un lead con los valores de COLUMNAS, en ese orden.
+
+    Ocupa menos que una lista de 9 elementos y los campos que se repiten en
+    casi todos los leads (país, sector, WhatsApp y fecha) se internan, así que
+    todos comparten la misma cadena. Se comporta como una secuencia, de modo
+    que se puede pasar directamente a sqlite3 o indexar como antes.
+    """
+
+    __slots__ = CAMPOS
+
+    def __init__(self, empresa, enlace, telefono, email, direccion, pais, sector, whatsapp, fecha):
+        self.empresa = empresa
+        self.enlace = enlace
+        self.telefono = telefono
+        self.email = email
+        self.direccion = direccion
+        self.pais = sys.intern(pais) if pais else pais
+        self.sector = sys.intern(sector) if sector else sector
+        self.whatsapp = sys.intern(whatsapp) if whatsapp else whatsapp
+        self.fecha = sys.intern(fecha) if fecha else fecha
+
+    def __len__(self):
+        return len(CAMPOS)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [getattr(self, campo) for campo in CAMPOS[indice]]
+        return getattr(self, CAMPOS[indice])
+
+    def __iter__(self):
+        return (getattr(self, campo) for campo in CAMPOS)
+
+    def __eq__(self, otro):
+        return list(self) == list(otro)
+
+    def __repr__(self):
+        return f"Lead({', '.join(repr(valor) for valor in self)})"
+
+    def __reduce__(self):
+        # Al pasar entre procesos se reconstruye con el constructor, que vuelve a internar
+        return (Lead, tuple(self))
+
+
+class AlmacenLeads:
+    """Almacén de leads de solo inserción respaldado por SQLite.
+
+    Cada lead se confirma en disco en cuanto se encuentra, con coste
+    constante por inserción. La exportación al Excel con formato es un paso
+    aparte que se ejecuta al final o bajo demanda.
+    """
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        self.ruta = ruta
+        # Con el pipeline, la conexión se abre en el hilo principal y escribe el sumidero;
+        # nunca hay dos hilos escribiendo a la vez
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        # WAL permite confirmar cada inserción sin reescribir el fichero
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS leads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                empresa TEXT,
+                enlace TEXT,
+                telefono TEXT,
+                email TEXT,
+                direccion TEXT,
+                pais TEXT,
+                sector TEXT,
+                whatsapp TEXT,
+                fecha TEXT
+            )
+        """)
+        self.conexion.commit()
+
+    def agregar(self, lead):
+        """Añade un lead (lista con los valores de COLUMNAS) y lo confirma"""
+        self.agregar_lote([lead])
+
+    def agregar_lote(self, leads):
+        """Añade varios leads en una sola transacción"""
+        self.conexion.executemany(
+            "INSERT INTO leads (empresa, enlace, telefono, email, direccion, pais, sector, whatsapp, fecha) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            leads
+        )
+        self.conexion.commit()
+
+    def contar(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def leer(self):
+        """Recorre todos los leads en orden de inserción sin cargarlos a la vez en memoria"""
+        cursor = self.conexion.execute(
+            "SELECT empresa, enlace, telefono, email, direccion, pais, sector, whatsapp, fecha "
+            "FROM leads ORDER BY id"
+        )
+        for fila in cursor:
+            yield Lead(*fila)
+
+    def tandas_unicos(self, filas_por_tanda=FILAS_POR_TANDA):
+        """Leads únicos por teléfono y email, en tandas de filas"""
+        cursor = self.conexion.execute(CONSULTA_UNICOS)
+        while True:
+            tanda = cursor.fetchmany(filas_por_tanda)
+            if not tanda:
+                return
+            yield tanda
+
+    def anchos_columnas(self):
+        """Longitud máxima de cada columna entre los leads únicos, calculada por SQLite"""
+        maximos = ", ".join(f"MAX(LENGTH({campo}))" for campo in CAMPOS)
+        fila = self.conexion.execute(f"SELECT {maximos} FROM ({CONSULTA_UNICOS})").fetchone()
+        return [max(len(titulo), longitud or 0) for titulo, longitud in zip(COLUMNAS, fila)]
+
+    def exportar(self, ruta=RUTA_EXCEL):
+        """Exporta los leads únicos según la extensión (.xlsx, .csv o .parquet) y devuelve cuántos son.
+
+        Las filas se leen y se escriben por tandas, así que la memoria necesaria
+        no depende del número de leads.
+        """
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension == ".csv":
+            return self.exportar_csv(ruta)
+        if extension == ".parquet":
+            return self.exportar_parquet(ruta)
+        return self.exportar_excel(ruta)
+
+    def exportar_csv(self, ruta):
+        total = 0
+        with open(ruta, "w", newline="", encoding="utf-8-sig") as fichero:
+            escritor = csv.writer(fichero)
+            escritor.writerow(COLUMNAS)
+            for tanda in self.tandas_unicos():
+                escritor.writerows(tanda)
+                total += len(tanda)
+        return total
+
+    def exportar_parquet(self, ruta):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("la exportación a Parquet necesita pyarrow (pip install pyarrow)")
+
+        esquema = pa.schema([(columna, pa.string()) for columna in COLUMNAS])
+        total = 0
+        with pq.ParquetWriter(ruta, esquema) as escritor:
+            for tanda in self.tandas_unicos():
+                columnas = [pa.array(valores, pa.string()) for valores in zip(*tanda)]
+                escritor.write_table(pa.Table.from_arrays(columnas, schema=esquema))
+                total += len(tanda)
+        return total
+
+    def exportar_excel(self, ruta=RUTA_EXCEL):
+        """Vuelca los leads únicos al Excel con formato y devuelve cuántos se escribieron"""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+        from openpyxl.utils import get_column_letter
+
+        # Libro de solo escritura: las filas van directamente al fichero
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet("Leads")
+
+        # El ancho de las columnas debe fijarse antes de escribir ninguna fila
+        for numero, ancho in enumerate(self.anchos_columnas(), 1):
+            hoja.column_dimensions[get_column_letter(numero)].width = ancho + 2
+
+        # Cabecera con el mismo estilo que usaba pandas
+        borde = Side(style="thin")
+        cabecera = []
+        for columna in COLUMNAS:
+            celda = WriteOnlyCell(hoja, value=columna)
+            celda.font = Font(bold=True)
+            celda.border = Border(left=borde, right=borde, top=borde, bottom=borde)
+            celda.alignment = Alignment(horizontal="center", vertical="top")
+            cabecera.append(celda)
+        hoja.append(cabecera)
+
+        total = 0
+        for tanda in self.tandas_unicos():
+            for fila in tanda:
+                hoja.append(fila)
+            total += len(tanda)
+        libro.save(ruta)
+        return total
+
+    def cerrar(self):
+        self.conexion.close()
@@ -0,0 +1,980 @@
+"""Benchmarks del extractor de leads.
+
+Uso:
+    python benchmarks.py guardado [--leads N]
+    python benchmarks.py exportacion [--leads N]
+    python benchmarks.py extraccion [--fragmentos N] [--ejemplos N]
+    python benchmarks.py paises [--fragmentos N]
+    python benchmarks.py arranque [--repeticiones N] [--navegador]
+    python benchmarks.py reproduccion [--paginas N | --directorio DIR]
+    python benchmarks.py cola [--trabajos N] [--latencia S] [--procesos 1 2 4 8]
+    python benchmarks.py revalidacion [--filas N]
+    python benchmarks.py pool [--trabajadores N] [--intervalo S]
+    python benchmarks.py enriquecimiento [--empresas N] [--relleno KB]
+"""
+import argparse
+import contextlib
+import functools
+import html
+import http.server
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import urllib.parse
+
+from almacen import AlmacenLeads, Lead
+from cola_trabajos import ColaTrabajos, trabajar
+from dedup import IndiceDedup
+from extraccion import DetectorPais, MotorExtraccion, motor_para_consulta
+from paises import PAISES
+
+
+def lead_sintetico(i):
+    return [
+        f"Empresa {i}",
+        f"https://empresa{i}.com.py/contacto",
+        f"+595981{i:06d}",
+        f"contacto{i}@empresa{i}.com.py",
+        f"Avenida Mariscal López {i}",
+        "Paraguay",
+        "residencia fiscal paraguay",
+        "No",
+        time.strftime("%Y-%m-%d")
+    ]
+
+
+def bench_guardado(args):
+    """Mide el coste por guardado a medida que crece el número de leads"""
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = AlmacenLeads(os.path.join(directorio, "leads.db"))
+        tramo = max(args.leads // 10, 1)
+        print(f"{'leads':>10} {'µs/guardado':>14}")
+        inicio_tramo = time.perf_counter()
+        for i in range(1, args.leads + 1):
+            almacen.agregar(lead_sintetico(i))
+            if i % tramo == 0:
+                transcurrido = time.perf_counter() - inicio_tramo
+                print(f"{i:>10} {transcurrido / tramo * 1e6:>14.1f}")
+                inicio_tramo = time.perf_counter()
+
+        inicio = time.perf_counter()
+        total = almacen.exportar_excel(os.path.join(directorio, "leads.xlsx"))
+        print(f"Exportación final de {total} leads: {time.perf_counter() - inicio:.2f}s")
+        almacen.cerrar()
+
+
+def bench_exportacion(args):
+    """Memoria de los leads en memoria y pico de memoria de la exportación frente al número de leads"""
+    tracemalloc.start()
+    for nombre, crear in (("listas", list), ("Lead", lambda valores: Lead(*valores))):
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        leads = [crear(lead_sintetico(i)) for i in range(args.leads)]
+        print(f"{args.leads} leads como {nombre}: {(tracemalloc.get_traced_memory()[0] - antes) / 2 ** 20:.1f} MB")
+        del leads
+
+    with tempfile.TemporaryDirectory() as directorio:
+        almacen = AlmacenLeads(os.path.join(directorio, "leads.db"))
+        print(f"{'leads':>10} {'formato':>8} {'segundos':>9} {'pico MB':>8}")
+        guardados = 0
+        for tamano in (args.leads // 10, args.leads):
+            almacen.agregar_lote([lead_sintetico(i) for i in range(guardados, tamano)])
+            guardados = tamano
+            for extension in ("xlsx", "csv", "parquet"):
+                ruta = os.path.join(directorio, "leads." + extension)
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                inicio = time.perf_counter()
+                try:
+                    almacen.exportar(ruta)
+                except RuntimeError as e:
+                    print(f"{tamano:>10} {extension:>8} {e}")
+                    continue
+                duracion = time.perf_counter() - inicio
+                pico = tracemalloc.get_traced_memory()[1] - base
+                print(f"{tamano:>10} {extension:>8} {duracion:>9.2f} {pico / 2 ** 20:>8.1f}")
+        almacen.cerrar()
+    tracemalloc.stop()
+
+
+def fragmento_sintetico(aleatorio):
+    """Texto parecido al de un resultado de Google, con o sin datos de contacto"""
+    partes = [aleatorio.choice([
+        "Estudio jurídico especializado en residencia fiscal y ciudadanía.",
+        "Asesoría contable para expatriados en Asunción y Montevideo.",
+        "Family office con sede en Punta del Este, Uruguay.",
+        "Más de 20 años de experiencia en banca privada. Consultas 24 h.",
+        "Fundado en 1998, 150 clientes, 3 oficinas en el Paraguay.",
+    ])]
+    for _ in range(aleatorio.randint(0, 3)):
+        partes.append(aleatorio.choice([
+            f"Tel: +595 21 {aleatorio.randint(100, 999)} {aleatorio.randint(100, 999)}",
+            f"Celular (0981) {aleatorio.randint(100, 999)}-{aleatorio.randint(100, 999)}",
+            f"WhatsApp 09{aleatorio.randint(1, 9)} {aleatorio.randint(100, 999)} {aleatorio.randint(100, 999)}",
+            f"Teléfono +598 2{aleatorio.randint(100, 999)} {aleatorio.randint(1000, 9999)}",
+            f"contacto{aleatorio.randint(1, 99)}@estudio.com.{aleatorio.choice(['py', 'uy'])}",
+            f"Avenida España {aleatorio.randint(100, 3000)}  Centro",
+            "Escríbenos por WhatsApp para más información",
+        ]))
+    aleatorio.shuffle(partes)
+    return " ".join(partes)
+
+
+# Referencia congelada: las funciones de extracción de LeadsExtractor antes de la tabla de
+# países, copiadas tal cual para medir el motor contra el comportamiento original
+def _detectar_pais_original(texto):
+    texto = texto.lower()
+    if any(keyword in texto for keyword in ["paraguay", "asunción", "asuncion", "py", "paraguayo", "paraguaya"]):
+        return "Paraguay"
+    elif any(keyword in texto for keyword in ["uruguay", "montevideo", "uy", "uruguayo", "uruguaya"]):
+        return "Uruguay"
+    if "+595" in texto or "0595" in texto:
+        return "Paraguay"
+    elif "+598" in texto or "0598" in texto:
+        return "Uruguay"
+    return None
+
+
+def _normalizar_numero_original(numero, prefijo_pais):
+    numero = re.sub(r'[\s\-\(\)]', '', numero)
+    if numero.startswith(prefijo_pais):
+        return numero
+    if numero.startswith('0' + prefijo_pais[1:]):
+        return '+' + numero[1:]
+    elif numero.startswith(prefijo_pais[1:]):
+        return '+' + numero
+    elif numero.startswith('0'):
+        return prefijo_pais + numero[1:]
+    else:
+        return prefijo_pais + numero
+
+
+def _extraer_numeros_original(texto, consulta):
+    pais_consulta = "Paraguay" if "paraguay" in consulta.lower() else "Uruguay"
+    prefijo_pais = "+595" if pais_consulta == "Paraguay" else "+598"
+    if pais_consulta == "Paraguay":
+        patrones = [
+            r'(?:tel[eé]fono|tel|phone|movil|móvil|celular|contact|fijo|fax|whatsapp|wsp|wa)?\s*:?\s*'
+            r'(?:\+595|595|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){8,}',
+            r'(?:\+595|595|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){8,}',
+            r'\b(?:0|9)[\s\-\(\)]*(?:\d[\s\-\(\)]*){7,}'
+        ]
+        long_numero = 12
+    else:
+        patrones = [
+            r'(?:tel[eé]fono|tel|phone|movil|móvil|celular|contact|fijo|fax|whatsapp|wsp|wa)?\s*:?\s*'
+            r'(?:\+598|598|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){7,}',
+            r'(?:\+598|598|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){7,}',
+            r'\b(?:0|9)[\s\-\(\)]*(?:\d[\s\-\(\)]*){6,}'
+        ]
+        long_numero = 11
+    numeros_encontrados = []
+    texto = texto.lower()
+    for patron in patrones:
+        for match in re.findall(patron, texto, re.IGNORECASE):
+            numero_normalizado = _normalizar_numero_original(re.sub(r'[^\d\+]', '', match), prefijo_pais)
+            if len(re.sub(r'[^\d]', '', numero_normalizado)) == long_numero:
+                numeros_encontrados.append(numero_normalizado)
+    return list(set(numeros_encontrados))
+
+
+def _extraer_whatsapp_original(texto):
+    texto = texto.lower()
+    patrones_whatsapp = [
+        r'(?:whatsapp|wsp|wa|whats app)[\s\:]*(?:\+?[0-9][\s\-\(\)]*){7,}',
+        r'(?:contacto|contactar|escribir)(?:\s\w+){0,3}\s(?:al|por)\s(?:whatsapp|wsp|wa)',
+        r'(?:escríbenos|escribenos|contáctenos|contactenos)(?:\s\w+){0,3}\s(?:whatsapp|wsp|wa)'
+    ]
+    return any(re.search(patron, texto, re.IGNORECASE) for patron in patrones_whatsapp)
+
+
+def _extraer_original(texto, consulta):
+    """Campos de los leads como los obtenía el extractor original: ({número: país}, email, dirección, WhatsApp)"""
+    email = re.findall(r'[\w\.-]+@[\w\.-]+', texto)
+    direccion = re.findall(r'(?:Calle|Avenida|Ruta|Boulevard|Av\.|Dr\.|Camino).*?(?=\s{2,}|$)', texto)
+    pais = _detectar_pais_original(texto) or ("Paraguay" if "paraguay" in consulta.lower() else "Uruguay")
+    return (
+        {numero: pais for numero in _extraer_numeros_original(texto, consulta) or [""]},
+        email[0] if email else '',
+        direccion[0] if direccion else '',
+        _extraer_whatsapp_original(texto),
+    )
+
+
+def bench_extraccion(args):
+    """Compara el motor compilado con la copia congelada de las funciones de extracción originales"""
+    aleatorio = random.Random(1)
+    consultas = ["residencia fiscal paraguay", "residencia fiscal uruguay"]
+    corpus = [(fragmento_sintetico(aleatorio), aleatorio.choice(consultas)) for _ in range(args.fragmentos)]
+
+    inicio = time.perf_counter()
+    esperados = [_extraer_original(texto, consulta) for texto, consulta in corpus]
+    tiempo_original = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtenidos = []
+    for consulta in consultas:
+        indices = [i for i, (_, c) in enumerate(corpus) if c == consulta]
+        lote = motor_para_consulta(consulta).extraer_lote([corpus[i][0] for i in indices])
+        obtenidos.extend(zip(indices, lote))
+    tiempo_motor = time.perf_counter() - inicio
+
+    # Cambios buscados: números con prefijo de otro país objetivo, con el país de su prefijo, y el
+    # país de la consulta por delante de los demás cuando el texto nombra varios
+    campos = ("teléfonos", "país", "email", "dirección", "whatsapp")
+    diferencias = dict.fromkeys(campos, 0)
+    extranjeros = pais_consulta = 0
+    distintos = []
+    inesperados = []
+    for i, info in obtenidos:
+        numeros, email, direccion, whatsapp = esperados[i]
+        paises = {numero: info['paises'].get(numero, info['pais']) for numero in info['telefonos'] or [""]}
+        nuevos_extranjeros = [numero for numero in paises if numero in info['paises'] and numero not in numeros]
+        extranjeros += len(nuevos_extranjeros)
+        cambios_pais = [numero for numero in paises.keys() & numeros.keys() if paises[numero] != numeros[numero]]
+        explicado = bool(cambios_pais) and all(
+            paises[numero] == motor_para_consulta(corpus[i][1]).pais for numero in cambios_pais
+        )
+        pais_consulta += explicado
+        comparaciones = (
+            set(paises) - set(nuevos_extranjeros) - {""} != set(numeros) - {""},
+            bool(cambios_pais),
+            info['email'] != email,
+            info['direccion'] != direccion,
+            info['whatsapp'] != whatsapp,
+        )
+        for campo, distinto in zip(campos, comparaciones):
+            diferencias[campo] += distinto
+        if any(comparaciones):
+            distintos.append(i)
+        if comparaciones[0] or any(comparaciones[2:]) or (cambios_pais and not explicado):
+            inesperados.append(i)
+
+    print(f"Fragmentos: {len(corpus)}")
+    print(f"Funciones originales: {len(corpus) / tiempo_original:>10.0f} fragmentos/s")
+    print(f"Motor compilado:      {len(corpus) / tiempo_motor:>10.0f} fragmentos/s "
+          f"(x{tiempo_original / tiempo_motor:.1f})")
+    print(f"Números de otro país objetivo añadidos: {extranjeros}")
+    print(f"Resultados distintos: {len(distintos)} "
+          f"({', '.join(f'{campo}: {cantidad}' for campo, cantidad in diferencias.items())})")
+    print(f"  con el país de la consulta, nombrado en el texto junto a otro: {pais_consulta}")
+    for i in distintos[:args.ejemplos]:
+        print(f"  [{corpus[i][1]}] {corpus[i][0]}")
+    if inesperados:
+        raise RuntimeError(f"{len(inesperados)} fragmentos con diferencias que no son de país, p. ej. "
+                           f"[{corpus[inesperados[0]][1]}] {corpus[inesperados[0]][0]}")
+
+
+def bench_paises(args):
+    """Coste de detectar el país y extraer contactos con 2 países frente a todos los de PAISES"""
+    aleatorio = random.Random(1)
+    corpus = [fragmento_sintetico(aleatorio).lower() for _ in range(args.fragmentos)]
+
+    print(f"Fragmentos: {len(corpus)}")
+    print(f"{'países':>7} {'palabras':>9} {'lineal/s':>11} {'autómata/s':>11} {'extracción/s':>13}")
+    for cantidad in (2, len(PAISES)):
+        paises = dict(list(PAISES.items())[:cantidad])
+
+        # Referencia: una búsqueda por país con sus palabras, como hacía detectar_pais
+        patrones_lineales = [
+            re.compile('|'.join(re.escape(palabra) for palabra in reglas['palabras'] + reglas['ciudades']))
+            for reglas in paises.values()
+        ]
+        inicio = time.perf_counter()
+        for texto in corpus:
+            for patron in patrones_lineales:
+                if patron.search(texto):
+                    break
+        tiempo_lineal = time.perf_counter() - inicio
+
+        detector = DetectorPais(paises)
+        inicio = time.perf_counter()
+        for texto in corpus:
+            detector.detectar(texto)
+        tiempo_automata = time.perf_counter() - inicio
+
+        # Todos los países de la tabla, no solo los objetivo, también en el patrón de números extranjeros
+        motor = MotorExtraccion("Paraguay", paises, extranjeros=list(paises))
+        inicio = time.perf_counter()
+        motor.extraer_lote(corpus)
+        tiempo_extraccion = time.perf_counter() - inicio
+
+        print(f"{cantidad:>7} {len(detector.pais_de_palabra):>9} {len(corpus) / tiempo_lineal:>11.0f} "
+              f"{len(corpus) / tiempo_automata:>11.0f} {len(corpus) / tiempo_extraccion:>13.0f}")
+
+
+# Proceso hijo del benchmark de arranque: importa main, abre Chrome y hace una búsqueda
+SCRIPT_PRIMERA_BUSQUEDA = """
+import json, sys, time
+inicio = time.perf_counter()
+from main import crear_driver_chrome, consulta_busqueda
+from urllib.parse import quote_plus
+tiempos = {'importacion': time.perf_counter() - inicio}
+driver = crear_driver_chrome(ligero=True)
+tiempos['driver'] = time.perf_counter() - inicio
+url = "https://www.google.com/search?q=" + quote_plus(consulta_busqueda(sys.argv[1]))
+driver.get(url)
+tiempos['primera_busqueda'] = time.perf_counter() - inicio
+inicio_reutilizada = time.perf_counter()
+driver.get(url + "&start=10")
+tiempos['busqueda_reutilizada'] = time.perf_counter() - inicio_reutilizada
+driver.quit()
+print(json.dumps(tiempos))
+"""
+
+
+def _ejecutar_hijo(codigo, *argumentos, directorio=None):
+    """Ejecuta código en un intérprete nuevo y devuelve (segundos de reloj, salida)"""
+    entorno = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, "-c", codigo, *argumentos], cwd=directorio, env=entorno,
+                             capture_output=True, text=True)
+    duracion = time.perf_counter() - inicio
+    if proceso.returncode:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else "error")
+    return duracion, proceso.stdout
+
+
+def bench_arranque(args):
+    """Tiempo hasta la primera búsqueda: importaciones, arranque del driver con y sin caché y sesión reutilizada"""
+    pesados = ["selenium", "webdriver_manager", "pandas", "openpyxl", "aiohttp"]
+    base = min(_ejecutar_hijo("pass")[0] for _ in range(args.repeticiones))
+    importacion = min(_ejecutar_hijo("import main")[0] for _ in range(args.repeticiones))
+    _, salida = _ejecutar_hijo(f"import main, sys; print(','.join(m for m in {pesados!r} if m in sys.modules))")
+    print(f"Intérprete vacío:      {base * 1000:>8.0f} ms")
+    print(f"import main:           {(importacion - base) * 1000:>8.0f} ms "
+          f"(módulos pesados cargados: {salida.strip() or 'ninguno'})")
+
+    if not args.navegador:
+        print("Arranque del navegador omitido (usar --navegador con Chrome instalado)")
+        return
+
+    from main import RUTA_CACHE_DRIVER
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for modo in ("sin caché", "con caché"):
+            if modo == "sin caché" and os.path.exists(os.path.join(directorio, RUTA_CACHE_DRIVER)):
+                os.remove(os.path.join(directorio, RUTA_CACHE_DRIVER))
+            try:
+                _, salida = _ejecutar_hijo(SCRIPT_PRIMERA_BUSQUEDA, "residencia fiscal paraguay",
+                                           directorio=directorio)
+            except RuntimeError as e:
+                print(f"No se pudo arrancar Chrome: {e}")
+                return
+            tiempos = json.loads(salida.strip().splitlines()[-1])
+            print(f"Driver {modo}:     {tiempos['driver'] * 1000:>8.0f} ms, primera búsqueda a los "
+                  f"{tiempos['primera_busqueda'] * 1000:.0f} ms "
+                  f"(importación {tiempos['importacion'] * 1000:.0f} ms)")
+        print(f"Búsqueda con la sesión ya abierta: {tiempos['busqueda_reutilizada'] * 1000:.0f} ms")
+
+
+def pagina_sintetica(aleatorio, consulta, resultados=10):
+    """HTML con la estructura de una página de resultados de Google"""
+    bloques = []
+    for i in range(resultados):
+        dominio = f"estudio{aleatorio.randint(1, 10 ** 6)}.com.{aleatorio.choice(['py', 'uy'])}"
+        bloques.append(
+            f'<div class="g"><div class="yuRUbf"><a href="https://{dominio}/">'
+            f'<h3 class="LC20lb">Estudio {i} - {html.escape(consulta)}</h3>'
+            f'<cite>https://{dominio}</cite></a></div>'
+            f'<div class="VwiC3b"><span>{html.escape(fragmento_sintetico(aleatorio))}</span></div></div>'
+        )
+    consulta_completa = html.escape(f'{consulta} AND ("contacto" OR "teléfono" OR "email")')
+    return (
+        f'<!doctype html><html><head><title>{html.escape(consulta)} - Buscar con Google</title>'
+        f'<style>.g{{margin:0}}</style><script>var datos = "0981 000 000";</script></head>'
+        f'<body><form><textarea name="q">{consulta_completa}</textarea></form>'
+        f'<div id="search"><div id="rso">{"".join(bloques)}</div></div></body></html>'
+    )
+
+
+def bench_reproduccion(args):
+    """Páginas/s, leads/s y memoria máxima del modo de reproducción sobre un corpus de páginas"""
+    from cache import MemoResultados
+    from main import LeadsExtractor, SECTORES
+    from reproduccion import listar_paginas, reproducir_paginas
+
+    with tempfile.TemporaryDirectory() as directorio:
+        paginas = args.directorio
+        if not paginas:
+            paginas = os.path.join(directorio, "paginas")
+            os.mkdir(paginas)
+            aleatorio = random.Random(1)
+            for i in range(args.paginas):
+                with open(os.path.join(paginas, f"{i:06d}.html"), "w", encoding="utf-8") as fichero:
+                    fichero.write(pagina_sintetica(aleatorio, SECTORES[i % len(SECTORES)]))
+        print(f"Páginas: {len(listar_paginas([paginas]))}")
+
+        memo = MemoResultados(os.path.join(directorio, "memo.db")) if args.memo else None
+        extractor = LeadsExtractor(ruta_almacen=os.path.join(directorio, "leads.db"), crear_driver=None,
+                                   ruta_indice=os.path.join(directorio, "leads.idx"), memo=memo)
+        if args.pipeline:
+            extractor.iniciar_pipeline(args.pipeline, args.capacidad_cola, args.procesos)
+        memoria_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        inicio = time.perf_counter()
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            estadisticas = reproducir_paginas(extractor, [paginas])
+        duracion = time.perf_counter() - inicio
+        memoria_maxima = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if extractor.pipeline is not None:
+            resumen_pipeline = extractor.pipeline.resumen()
+            extractor.pipeline.cerrar()
+        extractor.almacen.cerrar()
+        extractor.indice.cerrar()
+        if memo is not None:
+            resumen_memo = memo.resumen()
+            memo.cerrar()
+
+    print(f"Resultados: {estadisticas['resultados']}, leads: {estadisticas['leads']}")
+    print(f"Páginas/s: {estadisticas['paginas'] / duracion:.1f}")
+    print(f"Leads/s: {estadisticas['leads'] / duracion:.1f}")
+    print(f"Memoria máxima: {memoria_maxima / 1024:.1f} MB "
+          f"(+{(memoria_maxima - memoria_inicial) / 1024:.1f} MB durante la reproducción)")
+    if args.pipeline:
+        for linea in resumen_pipeline:
+            print(f"Pipeline {linea}")
+    if args.memo:
+        print(f"Memo de resultados: {resumen_memo}")
+
+
+def procesar_sintetico(latencia, sector, paginas):
+    """Trabajo de la cola sin navegador: espera la latencia de cada página y extrae 10 resultados"""
+    leads = []
+    motor = motor_para_consulta(sector)
+    for pagina in paginas:
+        time.sleep(latencia)
+        aleatorio = random.Random(f"{sector}-{pagina}")
+        for resultado, info in enumerate(motor.extraer_lote([fragmento_sintetico(aleatorio) for _ in range(10)])):
+            enlace = f"https://resultado{pagina}-{resultado}.com/"
+            for numero in info['telefonos'] or ([""] if info['email'] else []):
+                leads.append([f"Resultado {resultado}", enlace, numero, info['email'], info['direccion'],
+                              info['paises'].get(numero, info['pais']), sector,
+                              "Sí" if info['whatsapp'] else "No", "2026-01-01"])
+    return leads
+
+
+def _nodo_sintetico(ruta_cola, latencia, lease):
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        trabajar(ruta_cola, functools.partial(procesar_sintetico, latencia), duracion_lease=lease, espera=0.1)
+
+
+def _procesar_cola(directorio, sectores, args, procesos, matar=False):
+    """Procesa la cola con N procesos (matando uno a mitad si se pide) y devuelve (segundos, leads guardados)"""
+    ruta_cola = os.path.join(directorio, "cola.db")
+    cola = ColaTrabajos(ruta_cola, args.lease)
+    cola.crear_trabajos(sectores, 1)
+    inicio = time.perf_counter()
+    lanzados = [multiprocessing.Process(target=_nodo_sintetico, args=(ruta_cola, args.latencia, args.lease))
+                for _ in range(procesos)]
+    for proceso in lanzados:
+        proceso.start()
+    if matar:
+        time.sleep(args.latencia * 2.5)
+        lanzados[0].kill()
+    for proceso in lanzados:
+        proceso.join()
+    duracion = time.perf_counter() - inicio
+
+    estados = cola.estados()
+    if estados != {"completado": len(sectores)}:
+        raise RuntimeError(f"la cola no terminó completa: {estados}")
+    almacen = AlmacenLeads(os.path.join(directorio, "leads.db"))
+    indice = IndiceDedup(os.path.join(directorio, "leads.idx"))
+    cola.fusionar(almacen, indice)
+    # Repetir la fusión no debe añadir nada
+    repetidos = cola.fusionar(almacen, indice)
+    guardados = [tuple(lead) for lead in almacen.leer()]
+    almacen.cerrar()
+    indice.cerrar()
+    cola.cerrar()
+    if repetidos:
+        raise RuntimeError(f"la segunda fusión añadió {repetidos} leads")
+    return duracion, guardados
+
+
+def bench_cola(args):
+    """Trabajos/s de la cola compartida con N procesos y recuperación tras matar un proceso"""
+    sectores = [f"consulta {i} paraguay" for i in range(args.trabajos)]
+    print(f"Trabajos: {args.trabajos}, latencia por página: {args.latencia * 1000:.0f} ms")
+    print(f"{'procesos':>9} {'segundos':>9} {'trabajos/s':>11} {'aceleración':>12} {'leads':>7}")
+    referencia = None
+    for procesos in args.procesos:
+        with tempfile.TemporaryDirectory() as directorio:
+            duracion, leads = _procesar_cola(directorio, sectores, args, procesos)
+        if referencia is None:
+            # Tiempo equivalente con un solo proceso, a partir de la primera medición
+            referencia = duracion * procesos
+            primeros = leads
+        print(f"{procesos:>9} {duracion:>9.2f} {args.trabajos / duracion:>11.1f} "
+              f"{'x%.2f' % (referencia / duracion):>12} {len(leads):>7}")
+        if leads != primeros:
+            raise RuntimeError(f"con {procesos} procesos los leads difieren de los de {args.procesos[0]}")
+
+    procesos = max(args.procesos)
+    with tempfile.TemporaryDirectory() as directorio:
+        duracion, leads_con_caida = _procesar_cola(directorio, sectores, args, procesos, matar=True)
+    print(f"Con un proceso muerto a mitad ({procesos} procesos): {duracion:.2f}s, {len(leads_con_caida)} leads "
+          f"({'iguales' if leads_con_caida == primeros else 'DISTINTOS'} a la ejecución sin caídas)")
+    if leads_con_caida != primeros:
+        raise RuntimeError("los leads tras matar un proceso difieren de los de la ejecución sin caídas")
+
+
+def telefono_sintetico(aleatorio):
+    """Teléfono tal como puede estar guardado: con prefijo, troncal, local, extranjero, erróneo o vacío"""
+    return aleatorio.choice([
+        f"+595981{aleatorio.randint(0, 999999):06d}",
+        f"(0981) {aleatorio.randint(100, 999)}-{aleatorio.randint(100, 999)}",
+        f"9{aleatorio.randint(10, 99)} {aleatorio.randint(100, 999)} {aleatorio.randint(100, 999)}",
+        f"+598 9{aleatorio.randint(1000000, 9999999)}",
+        f"0598 2{aleatorio.randint(1000000, 9999999)}",
+        f"+54 11 {aleatorio.randint(1000, 9999)} {aleatorio.randint(1000, 9999)}",
+        f"+595 21 {aleatorio.randint(100, 999)}",
+        "",
+    ])
+
+
+def leads_para_revalidar(filas):
+    """DataFrame con las columnas del Excel y teléfonos en formatos variados"""
+    import pandas as pd
+    from almacen import COLUMNAS
+
+    aleatorio = random.Random(1)
+    paises = ["Paraguay", "Uruguay", "Argentina", ""]
+    sectores = ["residencia fiscal paraguay", "banca privada uruguay"]
+    datos = {columna: [""] * filas for columna in COLUMNAS}
+    datos['Empresa/Entidad'] = [f"Empresa {i % 5000}" for i in range(filas)]
+    datos['Teléfono'] = [telefono_sintetico(aleatorio) for _ in range(filas)]
+    datos['Email'] = [aleatorio.choice(["", f"info{i % 50000}@empresa.com"]) for i in range(filas)]
+    datos['País'] = [aleatorio.choice(paises) for _ in range(filas)]
+    datos['Sector'] = [aleatorio.choice(sectores) for _ in range(filas)]
+    return pd.DataFrame(datos)
+
+
+def bench_revalidacion(args):
+    """Revalidación vectorizada frente a las funciones fila a fila y revalidación completa de un CSV"""
+    from revalidacion import revalidar, revalidar_telefono, revalidar_telefonos
+
+    leads = leads_para_revalidar(args.filas)
+    print(f"Filas: {args.filas}")
+
+    inicio = time.perf_counter()
+    esperados = [revalidar_telefono(numero, pais, sector)
+                 for numero, pais, sector in zip(leads['Teléfono'], leads['País'], leads['Sector'])]
+    tiempo_filas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtenidos = revalidar_telefonos(leads['Teléfono'], leads['País'], leads['Sector'])
+    tiempo_vectorizado = time.perf_counter() - inicio
+
+    # Los números no válidos son None fila a fila y nulos en la versión vectorizada
+    obtenidos = obtenidos.astype(object).where(obtenidos.notna(), None)
+    diferencias = sum(1 for esperado, obtenido in zip(esperados, obtenidos) if esperado != obtenido)
+    print(f"Fila a fila:   {tiempo_filas:>7.2f}s ({args.filas / tiempo_filas:>10.0f} filas/s)")
+    print(f"Vectorizado:   {tiempo_vectorizado:>7.2f}s ({args.filas / tiempo_vectorizado:>10.0f} filas/s, "
+          f"x{tiempo_filas / tiempo_vectorizado:.1f})")
+    print(f"Resultados distintos: {diferencias}")
+    if diferencias:
+        raise RuntimeError(f"la revalidación vectorizada difiere de la fila a fila en {diferencias} filas")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, "leads.csv")
+        leads.to_csv(entrada, index=False)
+        inicio = time.perf_counter()
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            estadisticas = revalidar(entrada, os.path.join(directorio, "leads_revalidado.csv"))
+        print(f"CSV completo (lectura por tandas, deduplicación y escritura): "
+              f"{time.perf_counter() - inicio:.2f}s, {estadisticas}")
+
+
+class _WebEmpresa(http.server.BaseHTTPRequestHandler):
+    """Web de empresa simulada: /empresaN es una página grande con el enlace tel: al final.
+
+    La página se envía en dos tandas con una pausa entre ellas, de modo que el
+    enlace llega cuando el cliente ya tiene el principio en su búfer. Las
+    páginas de contacto no existen.
+    """
+
+    relleno = 256 * 1024
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        numero = re.fullmatch(r'/empresa(\d+)', self.path)
+        if not numero:
+            self.send_error(404)
+            return
+        cabecera = b"<html><body><p>" + b"Estudio contable con sede en Asuncion. " * (self.relleno // 39) + b"</p>"
+        final = f'<a href="tel:+595981{int(numero.group(1)):06d}">Llamar</a></body></html>'.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(cabecera) + len(final)))
+        self.end_headers()
+        self.wfile.write(cabecera)
+        self.wfile.flush()
+        time.sleep(0.05)
+        self.wfile.write(final)
+
+    def log_message(self, *argumentos):
+        pass
+
+
+def bench_enriquecimiento(args):
+    """Enriquecimiento contra un servidor HTTP local con el teléfono más allá de los primeros 64 KB"""
+    from enriquecimiento import Enriquecedor
+
+    _WebEmpresa.relleno = args.relleno * 1024
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _WebEmpresa)
+    servidor.daemon_threads = True
+    # Un cliente que deja de leer a mitad de página no es un error del servidor simulado
+    servidor.handle_error = lambda peticion, direccion: None
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+    enriquecedor = Enriquecedor()
+    try:
+        inicio = time.perf_counter()
+        for i in range(args.empresas):
+            enriquecedor.enviar(f"Empresa {i}", f"{base}/empresa{i}", "residencia fiscal paraguay")
+        recogidos = enriquecedor.drenar(esperar=True)
+        duracion = time.perf_counter() - inicio
+        resumen = enriquecedor.resumen()
+    finally:
+        enriquecedor.cerrar()
+        servidor.shutdown()
+        servidor.server_close()
+
+    esperados = {f"+595981{i:06d}" for i in range(args.empresas)}
+    encontrados = {numero for _, _, _, info in recogidos for numero in info['telefonos']}
+    print(f"Empresas: {args.empresas}, página de {args.relleno} KB con el enlace tel: al final")
+    print(f"Descargas: {resumen}")
+    print(f"Segundos: {duracion:.2f} ({args.empresas / duracion:.1f} empresas/s)")
+    print(f"Teléfonos encontrados: {len(encontrados & esperados)} de {len(esperados)}")
+    if encontrados != esperados:
+        raise RuntimeError(f"faltan {len(esperados - encontrados)} teléfonos y sobran {len(encontrados - esperados)}")
+
+
+class _ProcesoSimulado:
+    """service.process de un driver simulado: poll() devuelve el código de salida si ha caído"""
+
+    def __init__(self):
+        self.codigo = None
+
+    def poll(self):
+        return self.codigo
+
+
+class _ElementoSimulado:
+    """Elemento de la página que mostraba el driver al buscarlo; deja de valer al cambiar de página"""
+
+    def __init__(self, driver, al_pulsar=None):
+        self.driver = driver
+        self.pagina = driver.paginas_mostradas
+        self.al_pulsar = al_pulsar
+        self.texto = ""
+
+    def _comprobar(self):
+        from selenium.common.exceptions import StaleElementReferenceException
+
+        self.driver._comprobar()
+        if self.pagina != self.driver.paginas_mostradas:
+            raise StaleElementReferenceException("la página ha cambiado")
+
+    def is_displayed(self):
+        self._comprobar()
+        return True
+
+    def is_enabled(self):
+        self._comprobar()
+        return True
+
+    def click(self):
+        self._comprobar()
+        self.al_pulsar()
+
+    def clear(self):
+        self._comprobar()
+        self.texto = ""
+
+    def send_keys(self, texto):
+        from selenium.webdriver.common.keys import Keys
+
+        self._comprobar()
+        if texto == Keys.RETURN:
+            self.driver._mostrar(self.texto, 0)
+        else:
+            self.texto += texto
+
+
+class DriverSimulado:
+    """Sustituto de Chrome para el pool: Google con 10 resultados sintéticos deterministas por página.
+
+    Implementa lo que usa LeadsExtractor (get, execute_script, find_element(s),
+    current_window_handle, service.process y quit). Cada driver abierto deja un
+    fichero en el directorio, que quit() borra. En caidas se indica
+    {"driver" | "proceso" | "pagina": (texto de búsqueda, página)}: la primera
+    vez que un driver llega a esa página, Chrome cae (el proceso de
+    chromedriver termina), muere el proceso trabajador entero o la página no
+    carga (como con un CAPTCHA) con la sesión intacta.
+    """
+
+    def __init__(self, directorio, caidas=None):
+        self.directorio = directorio
+        self.caidas = caidas or {}
+        self.service = types.SimpleNamespace(process=_ProcesoSimulado())
+        self.paginas_mostradas = 0
+        self.busqueda = None
+        self.pagina = None
+        self.ruta = os.path.join(directorio, f"navegador-{os.getpid()}-{id(self)}")
+        open(self.ruta, "w").close()
+
+    def _comprobar(self):
+        from selenium.common.exceptions import WebDriverException
+
+        if self.service.process.codigo is not None:
+            raise WebDriverException("chrome not reachable")
+
+    def _caer(self, tipo):
+        """True la primera vez que cualquier driver llega a la página de la caída indicada"""
+        if self.caidas.get(tipo) != (self.busqueda, self.pagina):
+            return False
+        try:
+            open(os.path.join(self.directorio, f"caida-{tipo}"), "x").close()
+        except FileExistsError:
+            return False
+        return True
+
+    def _mostrar(self, busqueda, pagina):
+        self.busqueda, self.pagina = busqueda, pagina
+        self.paginas_mostradas += 1
+        if self._caer("proceso"):
+            # El trabajador muere con su navegador
+            os.remove(self.ruta)
+            os._exit(1)
+
+    @property
+    def current_window_handle(self):
+        self._comprobar()
+        return "ventana"
+
+    def get(self, url):
+        self._comprobar()
+        partes = urllib.parse.urlsplit(url)
+        parametros = urllib.parse.parse_qs(partes.query)
+        if partes.path == "/search":
+            self._mostrar(parametros['q'][0], int(parametros.get('start', ["0"])[0]) // 10)
+        else:
+            self._mostrar(None, None)
+
+    def execute_script(self, script, *argumentos):
+        from main import SCRIPT_EXTRAER_RESULTADOS
+
+        self._comprobar()
+        if script != SCRIPT_EXTRAER_RESULTADOS:
+            return "complete" if "readyState" in script else None
+        if self._caer("driver"):
+            self.service.process.codigo = 1
+            self._comprobar()
+        if self._caer("pagina"):
+            from selenium.common.exceptions import TimeoutException
+
+            raise TimeoutException("la página de resultados no cargó")
+        aleatorio = random.Random(f"{self.busqueda}-{self.pagina}")
+        resultados = []
+        for _ in range(10):
+            estudio = aleatorio.randint(1, 150)
+            resultados.append({'titulo': f"Estudio {estudio}", 'enlace': f"https://estudio{estudio}.com.py/",
+                               'texto': fragmento_sintetico(aleatorio)})
+        return resultados
+
+    def find_element(self, por, valor):
+        from selenium.common.exceptions import NoSuchElementException
+        from selenium.webdriver.common.by import By
+        from main import SELECTOR_RESULTADOS
+
+        self._comprobar()
+        if (por, valor) == (By.NAME, "q") and self.busqueda is None:
+            return _ElementoSimulado(self)
+        if (por, valor) == (By.CSS_SELECTOR, SELECTOR_RESULTADOS) and self.busqueda is not None:
+            return _ElementoSimulado(self)
+        if por == By.XPATH and "oeN89d" in valor and self.busqueda is not None:
+            return _ElementoSimulado(self, lambda: self._mostrar(self.busqueda, self.pagina + 1))
+        raise NoSuchElementException(valor)
+
+    def find_elements(self, por, valor):
+        from selenium.common.exceptions import NoSuchElementException
+
+        try:
+            return [self.find_element(por, valor)]
+        except NoSuchElementException:
+            return []
+
+    def quit(self):
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
+
+
+def _leads_guardados(ruta):
+    almacen = AlmacenLeads(ruta)
+    try:
+        return [tuple(lead) for lead in almacen.leer()]
+    finally:
+        almacen.cerrar()
+
+
+def bench_pool(args):
+    """Pool de navegadores y cola de trabajos simulados frente a una ejecución serie, con caídas"""
+    import main
+    from cache import PuntoControl
+    from cola_trabajos import ejecutar_cola
+    from pool_navegadores import PoolNavegadores
+    from ritmo import Ritmo
+
+    # Chrome cae a mitad de una consulta, un trabajador muere y una página no carga una vez
+    caidas = {
+        "driver": (main.consulta_busqueda(main.SECTORES[1]), 2),
+        "proceso": (main.consulta_busqueda(main.SECTORES[3]), 1),
+        "pagina": (main.consulta_busqueda(main.SECTORES[5]), 3),
+    }
+    with tempfile.TemporaryDirectory() as directorio, contextlib.chdir(directorio):
+        os.mkdir("serie")
+        inicio = time.perf_counter()
+        extractor = main.LeadsExtractor(
+            ruta_almacen=os.path.join("serie", "leads.db"), ruta_indice=os.path.join("serie", "leads.idx"),
+            crear_driver=functools.partial(DriverSimulado, "serie"), ritmo=Ritmo(args.intervalo),
+            punto_control=PuntoControl(os.path.join("serie", "punto_control.json"))
+        )
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            extractor.ejecutar()
+        duracion_serie = time.perf_counter() - inicio
+        serie = _leads_guardados(os.path.join("serie", "leads.db"))
+
+        os.mkdir("pool")
+        inicio = time.perf_counter()
+        pool = PoolNavegadores(
+            trabajadores=args.trabajadores, ruta_almacen=os.path.join("pool", "leads.db"),
+            crear_driver=functools.partial(DriverSimulado, "pool", caidas), intervalo_minimo=args.intervalo,
+            usar_cache=False, usar_memo=False, ruta_indice=os.path.join("pool", "leads.idx")
+        )
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            pool.ejecutar(main.SECTORES)
+        duracion_pool = time.perf_counter() - inicio
+        paralelo = _leads_guardados(os.path.join("pool", "leads.db"))
+
+        # La cola no relanza procesos muertos hasta que caduca el lease: eso lo mide el benchmark cola
+        os.mkdir("cola")
+        caidas_cola = {tipo: caida for tipo, caida in caidas.items() if tipo != "proceso"}
+        inicio = time.perf_counter()
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            ruta_cola = ejecutar_cola("cola", main.SECTORES, main.PAGINAS_POR_CONSULTA, procesos=args.trabajadores,
+                                      crear_driver=functools.partial(DriverSimulado, "cola", caidas_cola),
+                                      intervalo_minimo=args.intervalo, ttl_cache=None, enriquecer=False)
+            almacen = AlmacenLeads(os.path.join("cola", "leads.db"))
+            indice = IndiceDedup(os.path.join("cola", "leads.idx"))
+            cola = ColaTrabajos(ruta_cola)
+            cola.fusionar(almacen, indice)
+            estados = cola.estados()
+            cola.cerrar()
+            indice.cerrar()
+            almacen.cerrar()
+        duracion_cola = time.perf_counter() - inicio
+        en_cola = _leads_guardados(os.path.join("cola", "leads.db"))
+
+        caidas_producidas = {
+            carpeta: sorted(nombre[len("caida-"):] for nombre in os.listdir(carpeta) if nombre.startswith("caida-"))
+            for carpeta in ("pool", "cola")
+        }
+        sin_cerrar = [nombre for carpeta in ("serie", "pool", "cola") for nombre in os.listdir(carpeta)
+                      if nombre.startswith("navegador-")]
+
+    print(f"Consultas: {len(main.SECTORES)}, {main.PAGINAS_POR_CONSULTA} páginas cada una, "
+          f"{args.intervalo:.2f}s entre peticiones")
+    print(f"Serie:              {duracion_serie:>6.2f}s, {len(serie)} leads")
+    print(f"Pool ({args.trabajadores} navegadores): {duracion_pool:>6.2f}s, {len(paralelo)} leads "
+          f"(x{duracion_serie / duracion_pool:.1f}), caídas: {', '.join(caidas_producidas['pool']) or 'ninguna'}")
+    print(f"Cola ({args.trabajadores} procesos):    {duracion_cola:>6.2f}s, {len(en_cola)} leads "
+          f"(x{duracion_serie / duracion_cola:.1f}), caídas: {', '.join(caidas_producidas['cola']) or 'ninguna'}, "
+          f"estado {estados}")
+    print(f"Leads del pool {'iguales' if paralelo == serie else 'DISTINTOS'} a los de la ejecución serie")
+    print(f"Leads de la cola {'iguales' if en_cola == serie else 'DISTINTOS'} a los de la ejecución serie")
+    print(f"Navegadores sin cerrar: {len(sin_cerrar)}")
+    if paralelo != serie or en_cola != serie or set(estados) != {"completado"} or sin_cerrar:
+        raise RuntimeError("el pool o la cola no reproducen la ejecución serie o dejaron navegadores abiertos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks del extractor de leads")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    guardado = subparsers.add_parser("guardado", help="Coste por guardado frente al número de leads")
+    guardado.add_argument("--leads", type=int, default=20000)
+    guardado.set_defaults(funcion=bench_guardado)
+
+    exportacion = subparsers.add_parser("exportacion", help="Memoria de los leads y de la exportación por formato")
+    exportacion.add_argument("--leads", type=int, default=200000)
+    exportacion.set_defaults(funcion=bench_exportacion)
+
+    extraccion = subparsers.add_parser("extraccion", help="Motor compilado frente a las funciones originales")
+    extraccion.add_argument("--fragmentos", type=int, default=100000)
+    extraccion.add_argument("--ejemplos", type=int, default=5, help="Fragmentos distintos que se muestran")
+    extraccion.set_defaults(funcion=bench_extraccion)
+
+    paises = subparsers.add_parser("paises", help="Detección y extracción con 2 países frente a todos")
+    paises.add_argument("--fragmentos", type=int, default=100000)
+    paises.set_defaults(funcion=bench_paises)
+
+    arranque = subparsers.add_parser("arranque", help="Tiempo hasta la primera búsqueda")
+    arranque.add_argument("--repeticiones", type=int, default=5)
+    arranque.add_argument("--navegador", action="store_true",
+                          help="Mide también el arranque de Chrome y la primera búsqueda (requiere Chrome)")
+    arranque.set_defaults(funcion=bench_arranque)
+
+    reproduccion = subparsers.add_parser("reproduccion", help="Pipeline completo sobre páginas HTML guardadas")
+    reproduccion.add_argument("--paginas", type=int, default=2000,
+                              help="Número de páginas sintéticas a generar si no se indica directorio")
+    reproduccion.add_argument("--directorio", help="Directorio con páginas de resultados guardadas")
+    reproduccion.add_argument("--pipeline", type=int, default=0, metavar="TRABAJADORES",
+                              help="Reproduce a través del pipeline con este número de trabajadores de extracción")
+    reproduccion.add_argument("--capacidad-cola", type=int, default=200)
+    reproduccion.add_argument("--procesos", action="store_true",
+                              help="Trabajadores de extracción en procesos en lugar de hilos")
+    reproduccion.add_argument("--memo", action="store_true",
+                              help="Reutiliza los contactos de los resultados repetidos entre páginas")
+    reproduccion.set_defaults(funcion=bench_reproduccion)
+
+    cola = subparsers.add_parser("cola", help="Escalado de la cola de trabajos compartida entre procesos")
+    cola.add_argument("--trabajos", type=int, default=200)
+    cola.add_argument("--latencia", type=float, default=0.05,
+                      help="Segundos que simula tardar el navegador en cada página")
+    cola.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4, 8])
+    cola.add_argument("--lease", type=float, default=1,
+                      help="Duración del lease: tras matar un proceso, su trabajo se recupera pasado este tiempo")
+    cola.set_defaults(funcion=bench_cola)
+
+    revalidacion = subparsers.add_parser("revalidacion", help="Revalidación vectorizada frente a fila a fila")
+    revalidacion.add_argument("--filas", type=int, default=1000000)
+    revalidacion.set_defaults(funcion=bench_revalidacion)
+
+    pool = subparsers.add_parser("pool", help="Pool y cola con navegadores simulados frente a la ejecución serie")
+    pool.add_argument("--trabajadores", type=int, default=4)
+    pool.add_argument("--intervalo", type=float, default=0.02,
+                      help="Segundos mínimos entre peticiones de cada navegador")
+    pool.set_defaults(funcion=bench_pool)
+
+    enriquecimiento = subparsers.add_parser("enriquecimiento",
+                                            help="Enriquecimiento contra un servidor HTTP local")
+    enriquecimiento.add_argument("--empresas", type=int, default=50)
+    enriquecimiento.add_argument("--relleno", type=int, default=256,
+                                 help="KB de texto antes del enlace tel: en cada página")
+    enriquecimiento.set_defaults(funcion=bench_enriquecimiento)
+
+    args = parser.parse_args()
+    args.funcion(args)
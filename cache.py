@@ -0,0 +1,226 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from hashlib import blake2b
+
+from dedup import canonizar_url
+from extraccion import pais_de_consulta
+
+RUTA_CACHE = "cache_resultados.db"
+RUTA_MEMO = "memo_resultados.db"
+RUTA_PUNTO_CONTROL = "punto_control.json"
+TTL_CACHE = 24 * 3600
+MAX_PAGINAS_CACHE = 10000
+
+
+class CacheResultados:
+    """Caché en disco de los resultados ya extraídos de cada (consulta, página).
+
+    Las entradas caducan pasado el TTL y, si se supera el tamaño máximo, se
+    eliminan las menos usadas recientemente.
+    """
+
+    def __init__(self, ruta=RUTA_CACHE, ttl=TTL_CACHE, max_paginas=MAX_PAGINAS_CACHE):
+        self.ttl = ttl
+        self.max_paginas = max_paginas
+        self.aciertos = 0
+        self.fallos = 0
+        # Varios procesos del pool pueden compartir la misma caché
+        self.conexion = sqlite3.connect(ruta, timeout=30)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS paginas (
+                consulta TEXT,
+                pagina INTEGER,
+                resultados TEXT,
+                creado REAL,
+                usado REAL,
+                PRIMARY KEY (consulta, pagina)
+            )
+        """)
+        self.conexion.execute("CREATE INDEX IF NOT EXISTS paginas_usado ON paginas (usado)")
+        self.conexion.commit()
+
+    def obtener(self, consulta, pagina):
+        """Resultados guardados de la página o None si no están o han caducado"""
+        ahora = time.time()
+        fila = self.conexion.execute(
+            "SELECT resultados, creado FROM paginas WHERE consulta = ? AND pagina = ?",
+            (consulta, pagina)
+        ).fetchone()
+        if fila is None or ahora - fila[1] > self.ttl:
+            if fila is not None:
+                self.conexion.execute("DELETE FROM paginas WHERE consulta = ? AND pagina = ?", (consulta, pagina))
+                self.conexion.commit()
+            self.fallos += 1
+            return None
+
+        self.conexion.execute(
+            "UPDATE paginas SET usado = ? WHERE consulta = ? AND pagina = ?", (ahora, consulta, pagina)
+        )
+        self.conexion.commit()
+        self.aciertos += 1
+        return json.loads(fila[0])
+
+    def guardar(self, consulta, pagina, resultados):
+        ahora = time.time()
+        self.conexion.execute(
+            "INSERT OR REPLACE INTO paginas (consulta, pagina, resultados, creado, usado) VALUES (?, ?, ?, ?, ?)",
+            (consulta, pagina, json.dumps(resultados, ensure_ascii=False), ahora, ahora)
+        )
+        # Expulsar las entradas menos usadas recientemente si se supera el tamaño máximo
+        sobrantes = self.conexion.execute("SELECT COUNT(*) FROM paginas").fetchone()[0] - self.max_paginas
+        if sobrantes > 0:
+            self.conexion.execute(
+                "DELETE FROM paginas WHERE rowid IN (SELECT rowid FROM paginas ORDER BY usado LIMIT ?)",
+                (sobrantes,)
+            )
+        self.conexion.commit()
+
+    def resumen(self):
+        total = self.aciertos + self.fallos
+        tasa = self.aciertos / total * 100 if total else 0
+        return f"{self.aciertos} aciertos, {self.fallos} fallos ({tasa:.0f}% de acierto)"
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+def clave_resultado(enlace, texto, consulta):
+    """Enlace canónico, hash del fragmento y país de la consulta, del que dependen los prefijos válidos"""
+    huella = blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{canonizar_url(enlace)}|{huella}|{pais_de_consulta(consulta)}"
+
+
+class MemoResultados:
+    """Contactos ya extraídos de cada resultado, compartidos entre consultas y ejecuciones.
+
+    Un mismo resultado aparece en muchas consultas que se solapan; con el memo
+    no se vuelve a extraer y los leads que produce se descartan en el índice de
+    deduplicación. Cada término adicional en el que aparece se anota como
+    metadato en la tabla sectores en lugar de crear una fila nueva de lead.
+    Al abrirlo se eliminan los resultados caducados y sus términos.
+    """
+
+    def __init__(self, ruta=RUTA_MEMO, ttl=TTL_CACHE):
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self.sectores_adicionales = 0
+        # Los hilos de extracción del pipeline también guardan en el memo
+        self.bloqueo = threading.Lock()
+        self.conexion = sqlite3.connect(ruta, timeout=30, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS resultados (
+                clave TEXT PRIMARY KEY,
+                enlace TEXT,
+                info TEXT,
+                creado REAL
+            )
+        """)
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS sectores (
+                clave TEXT,
+                sector TEXT,
+                PRIMARY KEY (clave, sector)
+            )
+        """)
+        self.conexion.execute("CREATE INDEX IF NOT EXISTS resultados_creado ON resultados (creado)")
+        self.conexion.execute("DROP INDEX IF EXISTS resultados_enlace")
+        self.purgar()
+
+    def purgar(self):
+        """Elimina los resultados caducados y los términos anotados de resultados que ya no están"""
+        with self.bloqueo:
+            self.conexion.execute("DELETE FROM resultados WHERE creado < ?", (time.time() - self.ttl,))
+            self.conexion.execute("DELETE FROM sectores WHERE clave NOT IN (SELECT clave FROM resultados)")
+            self.conexion.commit()
+
+    def obtener(self, enlace, texto, consulta):
+        """Contactos extraídos antes para el resultado o None; en un acierto anota el término como metadato"""
+        clave = clave_resultado(enlace, texto, consulta)
+        with self.bloqueo:
+            fila = self.conexion.execute("SELECT info, creado FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is None or time.time() - fila[1] > self.ttl:
+                if fila is not None:
+                    self.conexion.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+                    self.conexion.execute("DELETE FROM sectores WHERE clave = ?", (clave,))
+                    self.conexion.commit()
+                self.fallos += 1
+                return None
+            cursor = self.conexion.execute(
+                "INSERT OR IGNORE INTO sectores (clave, sector) VALUES (?, ?)", (clave, consulta)
+            )
+            self.sectores_adicionales += cursor.rowcount
+            self.conexion.commit()
+            self.aciertos += 1
+        return json.loads(fila[0])
+
+    def guardar(self, enlace, texto, consulta, info):
+        clave = clave_resultado(enlace, texto, consulta)
+        with self.bloqueo:
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO resultados (clave, enlace, info, creado) VALUES (?, ?, ?, ?)",
+                (clave, canonizar_url(enlace), json.dumps(info, ensure_ascii=False), time.time())
+            )
+            self.conexion.execute("INSERT OR IGNORE INTO sectores (clave, sector) VALUES (?, ?)", (clave, consulta))
+            self.conexion.commit()
+
+    def resumen(self):
+        total = self.aciertos + self.fallos
+        tasa = self.aciertos / total * 100 if total else 0
+        return (f"{self.aciertos} aciertos, {self.fallos} fallos ({tasa:.0f}% de acierto), "
+                f"{self.sectores_adicionales} términos adicionales anotados")
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+class PuntoControl:
+    """Registro en disco de los sectores y páginas ya procesados para reanudar una ejecución"""
+
+    def __init__(self, ruta=RUTA_PUNTO_CONTROL):
+        self.ruta = ruta
+        self.sectores_completados = set()
+        self.paginas = {}
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as fichero:
+                estado = json.load(fichero)
+            self.sectores_completados = set(estado.get("sectores_completados", []))
+            self.paginas = {sector: set(paginas) for sector, paginas in estado.get("paginas", {}).items()}
+
+    def paginas_completadas(self, sector):
+        return self.paginas.get(sector, set())
+
+    def sector_completado(self, sector):
+        return sector in self.sectores_completados
+
+    def marcar_pagina(self, sector, pagina):
+        self.paginas.setdefault(sector, set()).add(pagina)
+        self._escribir()
+
+    def marcar_sector(self, sector):
+        self.sectores_completados.add(sector)
+        self.paginas.pop(sector, None)
+        self._escribir()
+
+    def _escribir(self):
+        # Escritura atómica: un corte a mitad no deja el fichero corrupto
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as fichero:
+            json.dump({
+                "sectores_completados": sorted(self.sectores_completados),
+                "paginas": {sector: sorted(paginas) for sector, paginas in self.paginas.items()}
+            }, fichero, ensure_ascii=False, indent=2)
+        os.replace(temporal, self.ruta)
+
+    def borrar(self):
+        """Elimina el punto de control cuando la ejecución termina completa"""
+        self.sectores_completados = set()
+        self.paginas = {}
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
@@ -0,0 +1,337 @@
+import contextlib
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from almacen import Lead
+from dedup import clave_lead
+
+NOMBRE_COLA = "cola.db"
+PAGINAS_POR_TRABAJO = 1
+DURACION_LEASE = 120
+MAX_INTENTOS = 3
+ESPERA_SIN_TRABAJOS = 2
+
+
+def propietario_actual():
+    """Identificador del proceso que reclama trabajos: máquina y PID"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ColaTrabajos:
+    """Cola de trabajos (consulta, rango de páginas) compartida en un fichero SQLite.
+
+    Cualquier número de procesos, en esta u otras máquinas que vean el mismo
+    directorio, reclaman trabajos con un lease que renuevan mientras trabajan.
+    La base usa el diario clásico (journal_mode=DELETE) y no WAL, que necesita
+    memoria compartida entre procesos y no funciona en sistemas de ficheros de
+    red; con varias máquinas, el directorio compartido debe admitir bloqueos
+    POSIX (NFSv4, SMB con bloqueos de bytes).
+    Si un proceso muere, su lease caduca y otro vuelve a reclamar el trabajo.
+    Los leads de cada trabajo se guardan en la misma transacción que lo da por
+    completado, con la clave de deduplicación como clave primaria, así que un
+    trabajo repetido tras una caída no duplica leads.
+    """
+
+    def __init__(self, ruta=NOMBRE_COLA, duracion_lease=DURACION_LEASE, max_intentos=MAX_INTENTOS):
+        self.ruta = ruta
+        self.duracion_lease = duracion_lease
+        self.max_intentos = max_intentos
+        # Sin transacciones implícitas: reclamar necesita BEGIN IMMEDIATE explícito
+        self.conexion = sqlite3.connect(ruta, timeout=30, isolation_level=None)
+        # WAL coordina a los lectores con un fichero -shm mapeado en memoria, que no se comparte por red
+        self.conexion.execute("PRAGMA journal_mode=DELETE")
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS trabajos (
+                id INTEGER PRIMARY KEY,
+                sector TEXT,
+                pagina_inicio INTEGER,
+                pagina_fin INTEGER,
+                estado TEXT DEFAULT 'pendiente',
+                propietario TEXT,
+                expira REAL,
+                intentos INTEGER DEFAULT 0,
+                UNIQUE (sector, pagina_inicio)
+            )
+        """)
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS resultados (
+                clave TEXT,
+                trabajo INTEGER,
+                orden INTEGER,
+                empresa TEXT,
+                enlace TEXT,
+                telefono TEXT,
+                email TEXT,
+                direccion TEXT,
+                pais TEXT,
+                sector TEXT,
+                whatsapp TEXT,
+                fecha TEXT,
+                PRIMARY KEY (trabajo, clave)
+            )
+        """)
+        self.conexion.execute("CREATE INDEX IF NOT EXISTS trabajos_estado ON trabajos (estado, expira)")
+
+    def crear_trabajos(self, sectores, paginas, paginas_por_trabajo=PAGINAS_POR_TRABAJO):
+        """Añade un trabajo por sector y rango de páginas; los que ya existen se conservan.
+
+        Devuelve cuántos trabajos nuevos se han creado.
+        """
+        trabajos = [
+            (sector, inicio, min(inicio + paginas_por_trabajo, paginas))
+            for sector in sectores
+            for inicio in range(0, paginas, paginas_por_trabajo)
+        ]
+        with self._transaccion():
+            antes = self.conexion.total_changes
+            self.conexion.executemany(
+                "INSERT OR IGNORE INTO trabajos (sector, pagina_inicio, pagina_fin) VALUES (?, ?, ?)", trabajos
+            )
+            return self.conexion.total_changes - antes
+
+    def reclamar(self, propietario):
+        """Reclama el primer trabajo pendiente o con el lease caducado.
+
+        Devuelve (id, sector, range de páginas) o None si no hay ninguno disponible.
+        """
+        ahora = time.time()
+        with self._transaccion():
+            # Un trabajo que ha tumbado a su proceso max_intentos veces no se vuelve a repartir
+            self.conexion.execute(
+                "UPDATE trabajos SET estado = 'fallido', propietario = NULL, expira = NULL "
+                "WHERE estado = 'en_curso' AND expira < ? AND intentos >= ?",
+                (ahora, self.max_intentos)
+            )
+            fila = self.conexion.execute(
+                "SELECT id, sector, pagina_inicio, pagina_fin FROM trabajos "
+                "WHERE estado = 'pendiente' OR (estado = 'en_curso' AND expira < ?) ORDER BY id LIMIT 1",
+                (ahora,)
+            ).fetchone()
+            if fila is None:
+                return None
+            self.conexion.execute(
+                "UPDATE trabajos SET estado = 'en_curso', propietario = ?, expira = ?, intentos = intentos + 1 "
+                "WHERE id = ?",
+                (propietario, ahora + self.duracion_lease, fila[0])
+            )
+        return fila[0], fila[1], range(fila[2], fila[3])
+
+    def renovar(self, trabajo, propietario):
+        """Alarga el lease del trabajo. Devuelve False si ya no pertenece al propietario"""
+        cursor = self.conexion.execute(
+            "UPDATE trabajos SET expira = ? WHERE id = ? AND propietario = ? AND estado = 'en_curso'",
+            (time.time() + self.duracion_lease, trabajo, propietario)
+        )
+        return cursor.rowcount == 1
+
+    def completar(self, trabajo, leads):
+        """Guarda los leads del trabajo y lo marca como completado en una sola transacción.
+
+        Si otro proceso ya lo completó tras reclamarlo por un lease caducado, los
+        leads repetidos se ignoran por su clave de deduplicación. La clave solo es
+        única dentro del trabajo: entre trabajos decide fusionar(), en el orden de
+        los trabajos y no en el que terminaron.
+        """
+        with self._transaccion():
+            self.conexion.executemany(
+                "INSERT OR IGNORE INTO resultados (clave, trabajo, orden, empresa, enlace, telefono, email, "
+                "direccion, pais, sector, whatsapp, fecha) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(clave_lead(lead[2], lead[3], lead[1]), trabajo, orden, *lead) for orden, lead in enumerate(leads)]
+            )
+            self.conexion.execute(
+                "UPDATE trabajos SET estado = 'completado', propietario = NULL, expira = NULL WHERE id = ?",
+                (trabajo,)
+            )
+
+    def liberar(self, trabajo, propietario):
+        """Devuelve el trabajo a la cola tras un error, o lo da por fallido tras max_intentos"""
+        self.conexion.execute(
+            "UPDATE trabajos SET estado = CASE WHEN intentos >= ? THEN 'fallido' ELSE 'pendiente' END, "
+            "propietario = NULL, expira = NULL WHERE id = ? AND propietario = ? AND estado = 'en_curso'",
+            (self.max_intentos, trabajo, propietario)
+        )
+
+    def estados(self):
+        """Número de trabajos en cada estado"""
+        return dict(self.conexion.execute("SELECT estado, COUNT(*) FROM trabajos GROUP BY estado"))
+
+    def fusionar(self, almacen, indice):
+        """Añade al almacén los leads de los trabajos completados que el índice aún no conoce.
+
+        Se recorren en el orden de los trabajos, así que varios nodos pueden
+        fusionar la misma cola en sus almacenes y repetir la fusión sin duplicar.
+        Devuelve cuántos leads se han añadido.
+        """
+        cursor = self.conexion.execute(
+            "SELECT empresa, enlace, telefono, email, direccion, pais, sector, whatsapp, fecha "
+            "FROM resultados ORDER BY trabajo, orden"
+        )
+        nuevos = [Lead(*fila) for fila in cursor if indice.agregar(fila[2], fila[3], fila[1])]
+        almacen.agregar_lote(nuevos)
+        indice.confirmar()
+        return len(nuevos)
+
+    @contextlib.contextmanager
+    def _transaccion(self):
+        # BEGIN IMMEDIATE toma el bloqueo de escritura antes de leer: dos procesos no reclaman lo mismo
+        self.conexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conexion.execute("ROLLBACK")
+            raise
+        self.conexion.execute("COMMIT")
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+class Latido(threading.Thread):
+    """Renueva el lease de un trabajo cada tercio de su duración mientras se procesa"""
+
+    def __init__(self, ruta, trabajo, propietario, duracion_lease):
+        super().__init__(daemon=True)
+        self.ruta = ruta
+        self.trabajo = trabajo
+        self.propietario = propietario
+        self.duracion_lease = duracion_lease
+        self.parar = threading.Event()
+        self.perdido = False
+
+    def run(self):
+        # Conexión propia: las de sqlite3 no se comparten entre hilos
+        cola = ColaTrabajos(self.ruta, self.duracion_lease)
+        try:
+            while not self.parar.wait(self.duracion_lease / 3):
+                if not cola.renovar(self.trabajo, self.propietario):
+                    self.perdido = True
+                    return
+        finally:
+            cola.cerrar()
+
+    def detener(self):
+        self.parar.set()
+        self.join()
+
+
+def trabajar(ruta_cola, procesar, duracion_lease=DURACION_LEASE, espera=ESPERA_SIN_TRABAJOS):
+    """Reclama y procesa trabajos hasta que no quede ninguno pendiente ni en curso.
+
+    procesar(sector, paginas) devuelve la lista de leads del trabajo o lanza una
+    excepción para devolverlo a la cola. Devuelve cuántos trabajos completó.
+    """
+    propietario = propietario_actual()
+    cola = ColaTrabajos(ruta_cola, duracion_lease)
+    completados = 0
+    try:
+        while True:
+            trabajo = cola.reclamar(propietario)
+            if trabajo is None:
+                # Los trabajos en curso de otros procesos pueden quedar libres si estos mueren
+                if not cola.estados().get("en_curso"):
+                    return completados
+                time.sleep(espera)
+                continue
+
+            identificador, sector, paginas = trabajo
+            latido = Latido(ruta_cola, identificador, propietario, duracion_lease)
+            latido.start()
+            try:
+                leads = procesar(sector, paginas)
+            except Exception as e:
+                latido.detener()
+                print(f"❌ {propietario}: error en '{sector}' (páginas {paginas.start + 1}-{paginas.stop}): {str(e)}")
+                cola.liberar(identificador, propietario)
+                continue
+            latido.detener()
+            if latido.perdido:
+                print(f"⚠️ {propietario}: el lease de '{sector}' caducó; otro proceso pudo repetirlo")
+            cola.completar(identificador, leads)
+            completados += 1
+            print(f"📥 {propietario}: '{sector}' páginas {paginas.start + 1}-{paginas.stop}, {len(leads)} leads")
+    finally:
+        cola.cerrar()
+
+
+def procesador_navegador(crear_driver, ritmo, cache, enriquecedor, memo=None):
+    """Función procesar de trabajar() que busca cada trabajo en un Chrome reutilizado entre trabajos"""
+    from main import LeadsExtractor
+
+    extractor = LeadsExtractor(ruta_almacen=None, ruta_indice=None, crear_driver=crear_driver, ritmo=ritmo,
+                               cache=cache, enriquecedor=enriquecedor, memo=memo)
+
+    def procesar(sector, paginas):
+        if not extractor.sesion_activa():
+            print("🔄 El navegador dejó de responder: reiniciando la sesión")
+            extractor.reiniciar_driver()
+        extractor.data = []
+        completada = extractor.buscar_numeros(sector, paginas)
+        extractor.procesar_enriquecidos(esperar=True)
+        # Un trabajo interrumpido o con alguna página fallida (CAPTCHA, timeout) se devuelve
+        # a la cola en lugar de darlo por hecho a medias
+        if not completada or not extractor.sesion_activa():
+            raise RuntimeError("la búsqueda se interrumpió o alguna página falló")
+        return extractor.data
+
+    return extractor, procesar
+
+
+def nodo(ruta_cola, crear_driver, intervalo_minimo, ttl_cache, duracion_lease, enriquecer, ttl_memo=None):
+    """Proceso de trabajo de la cola con su propio Chrome"""
+    from cache import CacheResultados, MemoResultados
+    from main import crear_enriquecedor
+    from ritmo import Ritmo
+
+    cache = CacheResultados(ttl=ttl_cache) if ttl_cache else None
+    memo = MemoResultados(ttl=ttl_memo) if ttl_memo else None
+    extractor, procesar = procesador_navegador(crear_driver, Ritmo(intervalo_minimo), cache,
+                                               crear_enriquecedor(enriquecer), memo)
+    try:
+        return trabajar(ruta_cola, procesar, duracion_lease)
+    finally:
+        try:
+            extractor.driver.quit()
+        except Exception:
+            pass
+        if extractor.enriquecedor is not None:
+            extractor.enriquecedor.cerrar()
+        if cache is not None:
+            cache.cerrar()
+        if memo is not None:
+            print(f"🧠 {propietario_actual()}: memo de resultados: {memo.resumen()}")
+            memo.cerrar()
+
+
+def ejecutar_cola(directorio, sectores, paginas, paginas_por_trabajo=PAGINAS_POR_TRABAJO, procesos=1,
+                  duracion_lease=DURACION_LEASE, **opciones_nodo):
+    """Encola los trabajos que falten en el directorio compartido y los procesa con N procesos locales.
+
+    Se puede lanzar a la vez en varias máquinas con el mismo directorio: cada
+    una reclama trabajos distintos hasta vaciar la cola.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta_cola = os.path.join(directorio, NOMBRE_COLA)
+    cola = ColaTrabajos(ruta_cola, duracion_lease)
+    nuevos = cola.crear_trabajos(sectores, paginas, paginas_por_trabajo)
+    print(f"📋 Cola de trabajos en '{ruta_cola}': {nuevos} trabajos nuevos, estado {cola.estados()}")
+    cola.cerrar()
+
+    argumentos = dict(opciones_nodo, ruta_cola=ruta_cola, duracion_lease=duracion_lease)
+    if procesos == 1:
+        nodo(**argumentos)
+    else:
+        lanzados = [multiprocessing.Process(target=nodo, kwargs=argumentos) for _ in range(procesos)]
+        for proceso in lanzados:
+            proceso.start()
+        for proceso in lanzados:
+            proceso.join()
+
+    cola = ColaTrabajos(ruta_cola, duracion_lease)
+    estados = cola.estados()
+    cola.cerrar()
+    print(f"✅ Cola procesada: {estados}")
+    return ruta_cola
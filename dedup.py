@@ -0,0 +1,102 @@
+import os
+import re
+from array import array
+from hashlib import blake2b
+from urllib.parse import parse_qs, urlsplit
+
+RUTA_INDICE = "leads.idx"
+
+PATRON_SEPARADORES = re.compile(r'[\s\-\(\)\.]')
+
+
+def canonizar_url(url):
+    """Forma canónica de un enlace: sin redirección de Google, www, fragmento ni barra final"""
+    if not url:
+        return ""
+    partes = urlsplit(url.strip())
+    # Enlaces del tipo https://www.google.com/url?q=<destino>
+    if partes.path == "/url" and "google." in partes.netloc:
+        destino = parse_qs(partes.query).get("q") or parse_qs(partes.query).get("url")
+        if destino:
+            partes = urlsplit(destino[0])
+    host = partes.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    canonica = host + partes.path.rstrip("/")
+    return canonica + "?" + partes.query if partes.query else canonica
+
+
+def clave_lead(telefono, email, enlace):
+    """Clave de deduplicación: teléfono y email normalizados o, sin ninguno, el enlace canónico"""
+    telefono = PATRON_SEPARADORES.sub('', telefono or '')
+    email = (email or '').strip().lower()
+    if telefono or email:
+        return f"t:{telefono}|e:{email}"
+    return f"u:{canonizar_url(enlace)}"
+
+
+def _hash(clave):
+    return int.from_bytes(blake2b(clave.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class IndiceDedup:
+    """Índice hash de los leads ya conocidos, persistente entre ejecuciones.
+
+    En memoria guarda un hash de 64 bits por lead y en disco un fichero binario
+    de 8 bytes por lead al que solo se añade, de modo que comprobar e insertar
+    una clave es O(1) incluso con cientos de miles de leads conocidos.
+
+    Los hashes nuevos quedan pendientes hasta confirmar(), que se llama una vez
+    guardados sus leads: si el guardado falla (descartar()) o el proceso muere
+    antes, el lead no queda marcado como conocido sin estar en el almacén.
+    """
+
+    def __init__(self, ruta=RUTA_INDICE):
+        self.ruta = ruta
+        self.hashes = set()
+        if os.path.exists(ruta):
+            guardados = array("Q")
+            with open(ruta, "rb") as fichero:
+                contenido = fichero.read()
+            # Descartar un último registro a medias si la escritura se cortó
+            guardados.frombytes(contenido[:len(contenido) - len(contenido) % guardados.itemsize])
+            self.hashes.update(guardados)
+        self.pendientes = []
+        self.fichero = open(ruta, "ab")
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contiene(self, telefono, email, enlace):
+        return _hash(clave_lead(telefono, email, enlace)) in self.hashes
+
+    def agregar(self, telefono, email, enlace):
+        """Registra el lead como pendiente y devuelve True si era nuevo o False si ya se conocía"""
+        valor = _hash(clave_lead(telefono, email, enlace))
+        if valor in self.hashes:
+            return False
+        self.hashes.add(valor)
+        self.pendientes.append(valor)
+        return True
+
+    def confirmar(self):
+        """Escribe en disco los hashes pendientes, después de guardar sus leads"""
+        if not self.pendientes:
+            return
+        self.fichero.write(b"".join(valor.to_bytes(8, "little") for valor in self.pendientes))
+        self.fichero.flush()
+        self.pendientes = []
+
+    def descartar(self):
+        """Olvida los hashes pendientes porque sus leads no se han podido guardar"""
+        self.hashes.difference_update(self.pendientes)
+        self.pendientes = []
+
+    def vaciar(self):
+        """Olvida todas las claves y trunca el fichero, para reconstruir el índice"""
+        self.hashes = set()
+        self.pendientes = []
+        self.fichero.truncate(0)
+
+    def cerrar(self):
+        self.fichero.close()
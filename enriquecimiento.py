@@ -0,0 +1,192 @@
+"""Enriquecimiento de resultados sin contactos a partir de la web de cada empresa.
+
+Las descargas se hacen con asyncio y aiohttp en un hilo propio, así que el
+bucle del navegador solo encola enlaces y recoge después los contactos
+encontrados sin esperar a la red.
+"""
+import asyncio
+import html
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from extraccion import motor_para_consulta
+from instrumentacion import metricas
+
+RUTAS_CONTACTO = ["/contacto", "/contact"]
+CONCURRENCIA = 20
+CONCURRENCIA_POR_HOST = 2
+TIMEOUT = 10
+TTL_CACHE_DOMINIO = 3600
+TAMANO_MAXIMO = 2 * 1024 * 1024
+# Límite de la caché de páginas: entradas y caracteres de texto en total
+ENTRADAS_CACHE = 500
+TAMANO_CACHE = 32 * 1024 * 1024
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+PATRON_OCULTOS = re.compile(r'<(script|style|noscript)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+PATRON_ENLACES_CONTACTO = re.compile(r'href\s*=\s*["\'](?:tel|mailto):([^"\'?]+)', re.IGNORECASE)
+PATRON_ETIQUETAS = re.compile(r'<[^>]+>')
+PATRON_ESPACIOS = re.compile(r'[ \t\r\f\v]+')
+
+
+def texto_de_html(contenido):
+    """Texto visible de una página, incluidos los destinos de enlaces tel: y mailto:"""
+    contenido = PATRON_OCULTOS.sub(" ", contenido)
+    enlaces = " ".join(PATRON_ENLACES_CONTACTO.findall(contenido))
+    texto = html.unescape(PATRON_ETIQUETAS.sub("\n", contenido))
+    return PATRON_ESPACIOS.sub(" ", texto) + "\n" + enlaces
+
+
+class Enriquecedor:
+    """Descarga la página de cada enlace y sus páginas de contacto probables.
+
+    Limita la concurrencia global y por host, aplica un timeout por petición y
+    guarda en caché las respuestas durante un tiempo, con un límite de entradas
+    y de tamaño que descarta primero las más antiguas. Los leads
+    encontrados se recogen con drenar() desde el hilo del navegador.
+    """
+
+    def __init__(self, concurrencia=CONCURRENCIA, por_host=CONCURRENCIA_POR_HOST, timeout=TIMEOUT,
+                 ttl_cache=TTL_CACHE_DOMINIO, rutas=RUTAS_CONTACTO, entradas_cache=ENTRADAS_CACHE,
+                 tamano_cache=TAMANO_CACHE):
+        self.concurrencia = concurrencia
+        self.por_host = por_host
+        self.timeout = timeout
+        self.ttl_cache = ttl_cache
+        self.rutas = rutas
+        self.resultados = queue.Queue()
+        self.pendientes = set()
+        self.cache = OrderedDict()   # url -> (momento, texto), de la más antigua a la más reciente
+        self.tamano_cache = 0
+        self.entradas_cache = entradas_cache
+        self.tamano_maximo_cache = tamano_cache
+        self.descargas = 0
+        self.errores = 0
+
+        self.bucle = asyncio.new_event_loop()
+        self.hilo = threading.Thread(target=self.bucle.run_forever, name="enriquecimiento", daemon=True)
+        self.hilo.start()
+        asyncio.run_coroutine_threadsafe(self._iniciar(), self.bucle).result()
+
+    async def _iniciar(self):
+        self.sesion = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrencia, limit_per_host=self.por_host),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": USER_AGENT}
+        )
+        self.semaforos_host = defaultdict(lambda: asyncio.Semaphore(self.por_host))
+        self.en_vuelo = {}
+
+    def enviar(self, titulo, enlace, consulta):
+        """Encola un resultado sin contactos para buscar en su web (no bloquea)"""
+        partes = urlsplit(enlace or "")
+        if partes.scheme not in ("http", "https") or not partes.netloc:
+            return
+        futuro = asyncio.run_coroutine_threadsafe(self._enriquecer(titulo, enlace, consulta), self.bucle)
+        self.pendientes.add(futuro)
+        futuro.add_done_callback(self.pendientes.discard)
+        metricas.contar("enriquecimientos_enviados")
+
+    def drenar(self, esperar=False, timeout=None):
+        """Devuelve los resultados enriquecidos disponibles: (titulo, enlace, consulta, info)"""
+        if esperar:
+            limite = time.monotonic() + timeout if timeout else None
+            while self.pendientes and (limite is None or time.monotonic() < limite):
+                time.sleep(0.05)
+        recogidos = []
+        while True:
+            try:
+                recogidos.append(self.resultados.get_nowait())
+            except queue.Empty:
+                return recogidos
+
+    async def _enriquecer(self, titulo, enlace, consulta):
+        partes = urlsplit(enlace)
+        base = f"{partes.scheme}://{partes.netloc}"
+        urls = [enlace] + [base + ruta for ruta in self.rutas if base + ruta != enlace.rstrip("/")]
+        textos = await asyncio.gather(*(self._descargar(partes.netloc, url) for url in urls))
+        texto = "\n".join(texto for texto in textos if texto)
+        if not texto:
+            return
+
+        info = motor_para_consulta(consulta).extraer(texto)
+        if info['telefonos'] or info['email']:
+            self.resultados.put((titulo, enlace, consulta, info))
+
+    async def _descargar(self, dominio, url):
+        """Texto de la página, desde la caché si sigue vigente"""
+        guardado = self.cache.get(url)
+        if guardado and time.monotonic() - guardado[0] < self.ttl_cache:
+            metricas.contar("enriquecimiento_cache_aciertos")
+            return guardado[1]
+        # Varias consultas pueden pedir la misma URL a la vez: compartir la descarga
+        if url in self.en_vuelo:
+            return await self.en_vuelo[url]
+
+        tarea = asyncio.ensure_future(self._pedir(dominio, url))
+        self.en_vuelo[url] = tarea
+        try:
+            texto = await tarea
+        finally:
+            del self.en_vuelo[url]
+        self._guardar_cache(url, texto)
+        return texto
+
+    def _guardar_cache(self, url, texto):
+        """Guarda el texto y descarta las entradas caducadas y las que excedan los límites"""
+        anterior = self.cache.pop(url, None)
+        if anterior is not None:
+            self.tamano_cache -= len(anterior[1])
+        ahora = time.monotonic()
+        self.cache[url] = (ahora, texto)
+        self.tamano_cache += len(texto)
+        # Todas comparten el TTL y están en orden de inserción: las caducadas van delante
+        while self.cache:
+            momento, antiguo = next(iter(self.cache.values()))
+            if (ahora - momento < self.ttl_cache and len(self.cache) <= self.entradas_cache
+                    and self.tamano_cache <= self.tamano_maximo_cache):
+                break
+            self.cache.popitem(last=False)
+            self.tamano_cache -= len(antiguo)
+
+    async def _pedir(self, dominio, url):
+        async with self.semaforos_host[dominio]:
+            inicio = time.perf_counter()
+            try:
+                async with self.sesion.get(url, allow_redirects=True) as respuesta:
+                    tipo = respuesta.headers.get("Content-Type", "")
+                    if respuesta.status != 200 or "html" not in tipo:
+                        return ""
+                    # read(n) solo devuelve lo que ya está en el búfer: leer hasta el final o el tamaño máximo
+                    partes = []
+                    leidos = 0
+                    async for parte in respuesta.content.iter_chunked(64 * 1024):
+                        partes.append(parte[:TAMANO_MAXIMO - leidos])
+                        leidos += len(partes[-1])
+                        if leidos >= TAMANO_MAXIMO:
+                            break
+                    contenido = b"".join(partes)
+                    self.descargas += 1
+                    return texto_de_html(contenido.decode(respuesta.charset or "utf-8", errors="replace"))
+            except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError, LookupError):
+                self.errores += 1
+                return ""
+            finally:
+                metricas.observar("descarga_enriquecimiento", time.perf_counter() - inicio)
+
+    def resumen(self):
+        return f"{self.descargas} páginas descargadas, {self.errores} errores"
+
+    def cerrar(self):
+        """Cierra la sesión HTTP y detiene el hilo del bucle de eventos"""
+        asyncio.run_coroutine_threadsafe(self.sesion.close(), self.bucle).result()
+        self.bucle.call_soon_threadsafe(self.bucle.stop)
+        self.hilo.join()
+        self.bucle.close()
@@ -0,0 +1,283 @@
+import re
+
+from paises import AMBIGUAS, PAISES, PREFIJOS, paises_por_prefijo
+
+# Tramos de texto formados solo por dígitos y separadores: cualquier número de
+# teléfono está contenido en uno de ellos, así que los patrones de cada país
+# solo se evalúan sobre los tramos candidatos y no sobre todo el texto
+PATRON_TRAMO = re.compile(r'[\+\d][\d\s\-\(\)]*')
+PATRON_NO_NUMERICO = re.compile(r'[^\d\+]')
+PATRON_SEPARADORES = re.compile(r'[\s\-\(\)]')
+
+PATRON_EMAIL = re.compile(r'[\w\.-]+@[\w\.-]+')
+PATRON_DIRECCION = re.compile(r'(?:Calle|Avenida|Ruta|Boulevard|Av\.|Dr\.|Camino).*?(?=\s{2,}|$)')
+PATRON_WHATSAPP = re.compile(
+    r'(?:whatsapp|wsp|wa|whats app)[\s\:]*(?:\+?[0-9][\s\-\(\)]*){7,}'
+    r'|(?:contacto|contactar|escribir)(?:\s\w+){0,3}\s(?:al|por)\s(?:whatsapp|wsp|wa)'
+    r'|(?:escríbenos|escribenos|contáctenos|contactenos)(?:\s\w+){0,3}\s(?:whatsapp|wsp|wa)',
+    re.IGNORECASE
+)
+SEPARADORES = r'[\s\-\(\)]*'
+# Palabra que, justo antes del nombre de un país o ciudad, indica que es el nombre de una calle
+PATRON_VIA = re.compile(
+    r'(?<!\w)(?:calle|avenida|avda\.?|av\.?|bulevar|boulevard|blvd\.?|ruta|rambla|camino|pasaje|plaza'
+    r'|esquina|esq\.?)\s*$'
+)
+LARGO_VIA = 12
+
+
+def _expresion_trie(palabras):
+    """Alternancia de las palabras factorizada como un trie.
+
+    El motor de expresiones regulares avanza así carácter a carácter por un
+    único árbol en lugar de probar cada palabra por separado en cada posición,
+    de modo que el coste apenas crece al añadir palabras.
+    """
+    trie = {}
+    for palabra in palabras:
+        nodo = trie
+        for caracter in palabra:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[''] = None
+
+    def expresion(nodo):
+        ramas = [re.escape(caracter) + expresion(hijo) for caracter, hijo in sorted(nodo.items()) if caracter]
+        if not ramas:
+            return ''
+        cuerpo = ramas[0] if len(ramas) == 1 else '(?:' + '|'.join(ramas) + ')'
+        if '' in nodo:
+            return '(?:' + cuerpo + ')?'
+        return cuerpo
+
+    return expresion(trie)
+
+
+class DetectorPais:
+    """Detecta el país de un texto con una sola búsqueda sobre las palabras clave de todos los países.
+
+    Las palabras (nombre, gentilicios y ciudades) solo coinciden como palabras
+    completas y los dominios solo tras un punto, así que "py" no coincide
+    dentro de "happy". Con un país preferido (el de la consulta) se buscan
+    primero sus palabras, su dominio y su prefijo, y solo si no aparecen los
+    del resto, donde gana la primera mención. Se ignoran los nombres que forman
+    parte de una calle ("Avenida Brasil") y, salvo para el país preferido, las
+    palabras de AMBIGUAS. Sin palabras clave, se recurre a los prefijos telefónicos.
+    """
+
+    def __init__(self, paises=PAISES, ambiguas=AMBIGUAS):
+        self.pais_de_palabra = {}
+        self.pais_de_dominio = {}
+        self.pais_de_codigo = {}
+        self.patrones_pais = {}
+        for pais, reglas in paises.items():
+            for palabra in reglas['palabras'] + reglas['ciudades']:
+                self.pais_de_palabra.setdefault(palabra, pais)
+            self.pais_de_dominio.setdefault(reglas['dominio'], pais)
+            self.pais_de_codigo.setdefault(reglas['prefijo'][1:], pais)
+            self.patrones_pais[pais] = self._patron_palabras(reglas['palabras'] + reglas['ciudades'],
+                                                             [reglas['dominio']])
+
+        self.patron_palabras = self._patron_palabras(self.pais_de_palabra, self.pais_de_dominio)
+        self.patron_inequivocas = self._patron_palabras(
+            [palabra for palabra in self.pais_de_palabra if palabra not in ambiguas], self.pais_de_dominio
+        )
+        # +595 y 00595 para cualquier país; 0595 solo con prefijos de tres cifras, que no
+        # se confunden con un número nacional marcado con el troncal
+        tres_cifras = [codigo for codigo in self.pais_de_codigo if len(codigo) == 3]
+        # (empezar por una clase de caracteres permite al motor saltar directamente a cada + o 0)
+        self.patron_prefijos = re.compile(
+            rf'[+0](?:(?:(?<=\+)|(?<=0)(?<!\d.)0)({_expresion_trie(self.pais_de_codigo)})'
+            rf'|(?<=0)(?<!\d.)({_expresion_trie(tres_cifras)}))'
+        )
+
+    @staticmethod
+    def _patron_palabras(palabras, dominios):
+        return re.compile(
+            rf'(?<!\w)({_expresion_trie(palabras)})(?!\w)'
+            rf'|\.({_expresion_trie(dominios)})(?!\w)'
+        )
+
+    @staticmethod
+    def _mencion(patron, texto_minusculas):
+        """Primera coincidencia del patrón que no es el nombre de una calle"""
+        for coincidencia in patron.finditer(texto_minusculas):
+            inicio = coincidencia.start()
+            if coincidencia.group(1) and PATRON_VIA.search(texto_minusculas, max(inicio - LARGO_VIA, 0), inicio):
+                continue
+            return coincidencia
+        return None
+
+    def detectar(self, texto_minusculas, pais_preferido=None):
+        if pais_preferido is not None and self._mencion(self.patrones_pais[pais_preferido], texto_minusculas):
+            return pais_preferido
+
+        coincidencia = self._mencion(self.patron_inequivocas, texto_minusculas)
+        if coincidencia:
+            palabra, dominio = coincidencia.groups()
+            return self.pais_de_palabra[palabra] if palabra else self.pais_de_dominio[dominio]
+
+        # Si no hay palabras clave, intentamos detectar por prefijos telefónicos
+        primero = None
+        for coincidencia in self.patron_prefijos.finditer(texto_minusculas):
+            pais = self.pais_de_codigo[coincidencia.group(1) or coincidencia.group(2)]
+            if pais == pais_preferido:
+                return pais
+            primero = primero or pais
+        return primero
+
+    def detectar_consulta(self, consulta_minusculas):
+        """País que nombra un término de búsqueda, incluidas las palabras ambiguas"""
+        coincidencia = self.patron_palabras.search(consulta_minusculas)
+        if coincidencia:
+            palabra, dominio = coincidencia.groups()
+            return self.pais_de_palabra[palabra] if palabra else self.pais_de_dominio[dominio]
+        return None
+
+
+_detector = DetectorPais()
+
+
+def pais_de_consulta(consulta):
+    """País al que apunta un término de búsqueda (el primero de PAISES si no nombra ninguno)"""
+    return _detector.detectar_consulta(consulta.lower()) or next(iter(PAISES))
+
+
+def detectar_pais(texto_minusculas):
+    """Detecta el país por palabras clave o prefijos telefónicos (texto ya en minúsculas)"""
+    return _detector.detectar(texto_minusculas)
+
+
+def _troncal(prefijo_pais):
+    for reglas in PAISES.values():
+        if reglas['prefijo'] == prefijo_pais:
+            return reglas['troncal']
+    return "0"
+
+
+def normalizar_numero(numero, prefijo_pais, troncal=None):
+    """Normaliza un número de teléfono al formato internacional correspondiente"""
+    if troncal is None:
+        troncal = _troncal(prefijo_pais)
+    numero = PATRON_SEPARADORES.sub('', numero)
+    if numero.startswith(prefijo_pais):
+        return numero
+    if troncal and numero.startswith(troncal + prefijo_pais[1:]):
+        return '+' + numero[len(troncal):]
+    if numero.startswith(prefijo_pais[1:]):
+        return '+' + numero
+    if troncal and numero.startswith(troncal):
+        return prefijo_pais + numero[len(troncal):]
+    return prefijo_pais + numero
+
+
+def es_numero_valido(numero, prefijo_pais):
+    """Verifica si un número en formato internacional es válido para el país del prefijo"""
+    numero = PATRON_SEPARADORES.sub('', numero)
+    for reglas in PAISES.values():
+        if reglas['prefijo'] == prefijo_pais:
+            nacional = numero[len(prefijo_pais):]
+            return numero.startswith(prefijo_pais) and nacional.isdigit() and len(nacional) in reglas['longitudes']
+    return False
+
+
+class MotorExtraccion:
+    """Extrae teléfonos, email, dirección, país y WhatsApp de un texto en una sola llamada.
+
+    Los patrones se generan una vez por país a partir de PAISES. Los números
+    del país de la consulta se aceptan con prefijo, troncal o en formato local;
+    los de los demás países objetivo (PREFIJOS), solo con prefijo internacional,
+    mediante un único patrón que reúne sus prefijos, y su lead lleva el país de
+    ese prefijo. El texto se recorre una sola vez en busca de tramos numéricos
+    y se pasa a minúsculas una única vez.
+    """
+
+    def __init__(self, pais, paises=PAISES, extranjeros=None):
+        self.pais = pais
+        reglas = paises[pais]
+        self.prefijo = reglas['prefijo']
+        self.troncal = reglas['troncal']
+        longitud = min(reglas['longitudes'])
+        digitos = self.prefijo[1:]
+        self.detector = _detector if paises is PAISES else DetectorPais(paises)
+
+        # Con prefijo internacional o troncal, y números locales que empiezan por el troncal o por 'inicio'
+        inicio_nacional = '|'.join([rf'\+{digitos}', digitos] + ([re.escape(self.troncal)] if self.troncal else []))
+        self.patrones = [
+            re.compile(rf'(?:{inicio_nacional}){SEPARADORES}(?:\d{SEPARADORES}){{{longitud - 1},}}'),
+        ]
+        if self.troncal or reglas['inicio']:
+            self.patrones.append(re.compile(
+                rf'\b[{re.escape(self.troncal + reglas["inicio"])}]{SEPARADORES}(?:\d{SEPARADORES}){{{longitud - 2},}}'
+            ))
+        self.longitud_minima = longitud - 1
+        self.longitudes_totales = {len(digitos) + longitud for longitud in reglas['longitudes']}
+
+        # Resto de países objetivo: +<prefijo> o 00<prefijo> seguido del número nacional
+        if extranjeros is None:
+            extranjeros = paises_por_prefijo(PREFIJOS)
+        extranjeros = [otro for otro in extranjeros if otro != pais and otro in paises]
+        self.longitudes_extranjeras = {
+            paises[otro]['prefijo'][1:]: set(paises[otro]['longitudes']) for otro in extranjeros
+        }
+        self.pais_de_codigo = {paises[otro]['prefijo'][1:]: otro for otro in extranjeros}
+        self.patron_extranjero = None
+        if extranjeros:
+            longitud_extranjera = min(min(longitudes) for longitudes in self.longitudes_extranjeras.values())
+            self.patron_extranjero = re.compile(
+                rf'[+0](?:(?<=\+)|(?<=0)(?<!\d.)0)({_expresion_trie(self.longitudes_extranjeras)})'
+                rf'({SEPARADORES}(?:\d{SEPARADORES}){{{longitud_extranjera},}})'
+            )
+
+    def extraer_telefonos(self, texto):
+        return list(self._telefonos(texto))
+
+    def _telefonos(self, texto):
+        """Números encontrados con el país de su prefijo (None para los del país de la consulta)"""
+        encontrados = {}
+        for tramo in PATRON_TRAMO.finditer(texto):
+            inicio, fin = tramo.span()
+            if fin - inicio < self.longitud_minima:
+                continue
+            for patron in self.patrones:
+                for match in patron.finditer(texto, inicio, fin):
+                    numero = normalizar_numero(PATRON_NO_NUMERICO.sub('', match.group()), self.prefijo, self.troncal)
+                    if len(numero) - numero.count('+') in self.longitudes_totales:
+                        encontrados[numero] = None
+            if self.patron_extranjero is None:
+                continue
+            for match in self.patron_extranjero.finditer(texto, inicio, fin):
+                codigo, resto = match.groups()
+                nacional = PATRON_NO_NUMERICO.sub('', resto)
+                if len(nacional) in self.longitudes_extranjeras[codigo]:
+                    encontrados.setdefault('+' + codigo + nacional, self.pais_de_codigo[codigo])
+        return encontrados
+
+    def extraer(self, texto):
+        minusculas = texto.lower()
+        email = PATRON_EMAIL.search(texto) if '@' in texto else None
+        direccion = PATRON_DIRECCION.search(texto)
+        telefonos = self._telefonos(minusculas)
+        return {
+            'telefonos': list(telefonos),
+            'email': email.group() if email else '',
+            'direccion': direccion.group() if direccion else '',
+            'pais': self.detector.detectar(minusculas, self.pais) or self.pais,
+            # País de los números con prefijo de otro país objetivo, que manda sobre el del texto
+            'paises': {numero: pais for numero, pais in telefonos.items() if pais},
+            'whatsapp': bool(PATRON_WHATSAPP.search(minusculas)),
+        }
+
+    def extraer_lote(self, textos):
+        """Aplica extraer a una lista de fragmentos"""
+        return [self.extraer(texto) for texto in textos]
+
+
+_motores = {}
+
+
+def motor_para_consulta(consulta):
+    """Motor precompilado para el país de la consulta (se crea una vez por país)"""
+    pais = pais_de_consulta(consulta)
+    if pais not in _motores:
+        _motores[pais] = MotorExtraccion(pais)
+    return _motores[pais]
@@ -0,0 +1,116 @@
+"""Temporizadores y contadores de las etapas del extractor.
+
+Desactivada por defecto: medir() devuelve un contexto vacío compartido y
+contar() retorna de inmediato, así que el coste sin --metricas es despreciable.
+"""
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+_SIN_MEDICION = nullcontext()
+
+
+class _Temporizador:
+    __slots__ = ("metricas", "etapa", "inicio")
+
+    def __init__(self, metricas, etapa):
+        self.metricas = metricas
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.metricas.tiempos[self.etapa].append(time.perf_counter() - self.inicio)
+        return False
+
+
+def _percentil(valores_ordenados, percentil):
+    indice = max(0, min(len(valores_ordenados) - 1, round(percentil / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+class Metricas:
+    def __init__(self):
+        self.activo = False
+        self.tiempos = defaultdict(list)
+        self.contadores = defaultdict(int)
+        self.inicio = time.perf_counter()
+
+    def activar(self):
+        self.activo = True
+        self.inicio = time.perf_counter()
+
+    def medir(self, etapa):
+        """Contexto que cronometra una etapa"""
+        if not self.activo:
+            return _SIN_MEDICION
+        return _Temporizador(self, etapa)
+
+    def observar(self, etapa, segundos):
+        if self.activo:
+            self.tiempos[etapa].append(segundos)
+
+    def contar(self, evento, cantidad=1):
+        if self.activo:
+            self.contadores[evento] += cantidad
+
+    def perfil(self):
+        """Resumen de la ejecución: percentiles por etapa, contadores y ritmos derivados"""
+        duracion = time.perf_counter() - self.inicio
+        etapas = {}
+        for etapa, valores in sorted(self.tiempos.items()):
+            ordenados = sorted(valores)
+            etapas[etapa] = {
+                'llamadas': len(ordenados),
+                'total_s': sum(ordenados),
+                'p50_s': _percentil(ordenados, 50),
+                'p95_s': _percentil(ordenados, 95),
+                'p99_s': _percentil(ordenados, 99),
+            }
+        paginas = self.contadores.get('paginas', 0)
+        return {
+            'duracion_s': duracion,
+            'etapas': etapas,
+            'contadores': dict(self.contadores),
+            'resultados_por_pagina': self.contadores.get('resultados', 0) / paginas if paginas else 0.0,
+            'leads_por_minuto': self.contadores.get('leads', 0) / duracion * 60 if duracion else 0.0,
+        }
+
+    def escribir(self, directorio):
+        """Escribe perfil.json y metricas.prom (formato de texto de Prometheus) en el directorio"""
+        os.makedirs(directorio, exist_ok=True)
+        perfil = self.perfil()
+        with open(os.path.join(directorio, "perfil.json"), "w", encoding="utf-8") as fichero:
+            json.dump(perfil, fichero, ensure_ascii=False, indent=2)
+
+        lineas = [
+            "# HELP leads_etapa_segundos Duración de cada etapa del extractor",
+            "# TYPE leads_etapa_segundos summary",
+        ]
+        for etapa, datos in perfil['etapas'].items():
+            for cuantil, clave in (("0.5", 'p50_s'), ("0.95", 'p95_s'), ("0.99", 'p99_s')):
+                lineas.append(f'leads_etapa_segundos{{etapa="{etapa}",quantile="{cuantil}"}} {datos[clave]:.6f}')
+            lineas.append(f'leads_etapa_segundos_sum{{etapa="{etapa}"}} {datos["total_s"]:.6f}')
+            lineas.append(f'leads_etapa_segundos_count{{etapa="{etapa}"}} {datos["llamadas"]}')
+        lineas += [
+            "# HELP leads_eventos_total Eventos contados durante la ejecución",
+            "# TYPE leads_eventos_total counter",
+        ]
+        for evento, cantidad in sorted(perfil['contadores'].items()):
+            lineas.append(f'leads_eventos_total{{evento="{evento}"}} {cantidad}')
+        lineas += [
+            "# TYPE leads_resultados_por_pagina gauge",
+            f"leads_resultados_por_pagina {perfil['resultados_por_pagina']:.3f}",
+            "# TYPE leads_por_minuto gauge",
+            f"leads_por_minuto {perfil['leads_por_minuto']:.3f}",
+        ]
+        with open(os.path.join(directorio, "metricas.prom"), "w", encoding="utf-8") as fichero:
+            fichero.write("\n".join(lineas) + "\n")
+
+
+# Instancia compartida por todos los módulos del proceso
+metricas = Metricas()
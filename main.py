@@ -1,16 +1,25 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
 import time
 import re
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from functools import partial
+from urllib.parse import quote_plus
+# Selenium se importa en los métodos que lo usan: exportar o reproducir páginas no lo necesita
+from almacen import AlmacenLeads, Lead, RUTA_ALMACEN, RUTA_EXCEL
+from extraccion import (PATRON_DIRECCION, PATRON_EMAIL, PATRON_WHATSAPP, detectar_pais, es_numero_valido,
+                        motor_para_consulta, normalizar_numero)
+from paises import PAISES, PREFIJOS, paises_por_prefijo
+from ritmo import Ritmo, INTERVALO_MINIMO
+from cache import CacheResultados, MemoResultados, PuntoControl, TTL_CACHE
+from instrumentacion import metricas
+from dedup import IndiceDedup, RUTA_INDICE
+from pipeline import Pipeline, CAPACIDAD_COLA
+from cola_trabajos import DURACION_LEASE, PAGINAS_POR_TRABAJO
 
 # Configuración
-PREFIJOS = ["+595", "+598"]  # Prefijos de Paraguay y Uruguay
 SECTORES = [
     # Términos relacionados a Paraguay
     "residencia fiscal paraguay",
@@ -36,75 +45,351 @@ SECTORES = [
     "offshore uruguay"
 ]
 
-class LeadsExtractor:
-    def __init__(self):
-        options = webdriver.ChromeOptions()
+PAGINAS_POR_CONSULTA = 5
+
+# Contenedores de resultados y elementos de los que se extrae el texto de cada uno
+SELECTOR_RESULTADOS = "div.g, div.hlcw0c"
+SELECTORES_TEXTO = [
+    "div.VwiC3b",        # Descripción principal
+    "div.kb0PBd",        # Información adicional
+    "div.dVsXxc",        # Contenedor de detalles
+    "div.B1uW2d",        # Datos de contacto
+    "div.YrbPuc",        # Información de la empresa
+    "div.X7NTVe",        # Detalles adicionales
+    "span"               # Cualquier otro texto
+]
+
+# Extrae todos los resultados de la página en una única llamada a chromedriver.
+# Solo se tiene en cuenta el texto visible, igual que WebElement.text
+SCRIPT_EXTRAER_RESULTADOS = """
+const [selectorResultados, selectores] = arguments;
+return Array.from(document.querySelectorAll(selectorResultados), (resultado) => {
+    const titulo = resultado.querySelector("h3");
+    const enlace = resultado.querySelector("a");
+    let texto = "";
+    for (const selector of selectores) {
+        for (const elem of resultado.querySelectorAll(selector)) {
+            if (!elem.getClientRects().length) continue;
+            const contenido = elem.innerText.trim();
+            if (contenido) texto += " " + contenido;
+        }
+    }
+    return {
+        titulo: titulo ? titulo.innerText : null,
+        enlace: enlace ? enlace.href : "",
+        texto: texto
+    };
+});
+"""
+
+# Perfil ligero del navegador: peticiones que no aportan nada a la extracción.
+# Las hojas de estilo no se bloquean: sin ellas innerText incluiría texto oculto
+URLS_BLOQUEADAS = [
+    # Imágenes y miniaturas
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.bmp", "*encrypted-tbn*", "*/images?q=tbn*",
+    # Fuentes y vídeo
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+    # Analítica, publicidad y balizas de Google
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googleadservices.com*",
+    "*googlesyndication.com*", "*/gen_204*", "*/client_204*", "*/log?format=*",
+]
+TAMANO_VENTANA_LIGERO = "1280,900"
+
+# Ruta y versión del último chromedriver que arrancó bien, para no resolverlo en cada arranque
+RUTA_CACHE_DRIVER = "chromedriver.json"
+
+# Tiempo de carga del documento actual según la Performance API (los bytes salen del registro de rendimiento)
+SCRIPT_TIEMPO_CARGA = """
+const navegacion = performance.getEntriesByType("navigation")[0];
+if (!navegacion) return null;
+return (navegacion.loadEventEnd || navegacion.domContentLoadedEventEnd) - navegacion.startTime;
+"""
+
+
+def consulta_busqueda(consulta):
+    """Término de búsqueda ampliado para encontrar datos de contacto"""
+    return f'{consulta} AND ("contacto" OR "teléfono" OR "telefono" OR "contact" OR "WhatsApp" OR "correo" OR "email")'
+
+
+def crear_driver_chrome(ligero=False):
+    """Inicia Chrome con las opciones del extractor.
+
+    Con ligero=True el navegador arranca sin ventana, con un tamaño fijo y
+    bloqueando imágenes, fuentes y rastreadores (URLS_BLOQUEADAS). Se prueba
+    primero el chromedriver guardado en RUTA_CACHE_DRIVER y, si no hay o ya
+    no sirve, se resuelve de nuevo y se guarda.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    options = webdriver.ChromeOptions()
+    if ligero:
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={TAMANO_VENTANA_LIGERO}")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    else:
         options.add_argument("--start-maximized")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--remote-allow-origins=*")
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--remote-allow-origins=*")
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    # Eventos de red de DevTools para medir los bytes transferidos por página
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    driver = None
+    cacheado = leer_driver_cacheado()
+    if cacheado:
+        try:
+            driver = webdriver.Chrome(service=Service(executable_path=cacheado['ruta']), options=options)
+            print(f"✅ Navegador iniciado con el chromedriver en caché ({cacheado['version']})")
+        except Exception as e:
+            print(f"⚠️ El chromedriver en caché ya no sirve, se resuelve de nuevo: {str(e)}")
+            borrar_driver_cacheado()
+
+    if driver is None:
         try:
             # Intentar inicializar el driver directamente
-            self.driver = webdriver.Chrome(options=options)
+            driver = webdriver.Chrome(options=options)
             print("✅ Navegador iniciado correctamente")
         except Exception as e:
             print(f"❌ Error al inicializar Chrome directamente: {str(e)}")
             try:
                 # Si falla, intentar con ChromeDriverManager
+                from webdriver_manager.chrome import ChromeDriverManager
+
                 driver_path = ChromeDriverManager().install()
                 service = Service(executable_path=driver_path)
-                self.driver = webdriver.Chrome(service=service, options=options)
+                driver = webdriver.Chrome(service=service, options=options)
                 print("✅ Navegador iniciado con ChromeDriverManager")
             except Exception as e:
                 print(f"❌ Error al inicializar Chrome con ChromeDriverManager: {str(e)}")
                 raise
-        
-        self.data = []
+        guardar_driver_cacheado(driver)
+
+    if ligero:
+        # Reglas de red de DevTools: las peticiones bloqueadas no llegan a salir del navegador
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": URLS_BLOQUEADAS})
+        print(f"🪶 Perfil ligero: sin ventana y {len(URLS_BLOQUEADAS)} patrones de URL bloqueados")
+    return driver
+
+
+def leer_driver_cacheado(ruta=RUTA_CACHE_DRIVER):
+    """Chromedriver guardado ({'ruta', 'version', 'navegador'}) si sigue existiendo, o None"""
+    try:
+        with open(ruta, encoding="utf-8") as fichero:
+            cacheado = json.load(fichero)
+    except (OSError, ValueError):
+        return None
+    if not os.access(cacheado.get('ruta') or "", os.X_OK):
+        return None
+    return cacheado
+
+
+def guardar_driver_cacheado(driver, ruta=RUTA_CACHE_DRIVER):
+    """Guarda la ruta y la versión del chromedriver con el que ha arrancado el navegador"""
+    try:
+        cacheado = {
+            'ruta': driver.service.path,
+            'version': driver.capabilities.get('chrome', {}).get('chromedriverVersion', "").split(" ")[0],
+            'navegador': driver.capabilities.get('browserVersion', ""),
+        }
+        # Escritura atómica: varios trabajadores del pool pueden arrancar a la vez
+        temporal = f"{ruta}.{os.getpid()}"
+        with open(temporal, "w", encoding="utf-8") as fichero:
+            json.dump(cacheado, fichero)
+        os.replace(temporal, ruta)
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar la ruta del chromedriver: {str(e)}")
+
+
+def borrar_driver_cacheado(ruta=RUTA_CACHE_DRIVER):
+    if os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def trafico_de_registros(registros):
+    """Bytes recibidos y peticiones bloqueadas según los eventos del registro de rendimiento"""
+    recibidos = 0
+    bloqueadas = 0
+    for registro in registros:
+        mensaje = json.loads(registro["message"])["message"]
+        if mensaje["method"] == "Network.loadingFinished":
+            recibidos += mensaje["params"].get("encodedDataLength", 0)
+        elif mensaje["method"] == "Network.loadingFailed" and mensaje["params"].get("blockedReason"):
+            bloqueadas += 1
+    return recibidos, bloqueadas
+
+
+def abrir_indice(ruta_indice, almacen=None):
+    """Abre el índice de deduplicación, reconstruyéndolo desde el almacén si no existe o no le corresponde"""
+    existia = os.path.exists(ruta_indice)
+    indice = IndiceDedup(ruta_indice)
+    if almacen is None:
+        return indice
+    # Cada clave del índice tiene al menos su lead en el almacén: si hay menos leads que
+    # claves, el almacén se ha borrado o sustituido y el índice rechazaría leads que no están
+    if existia and len(indice) > almacen.contar():
+        print(f"⚠️ El índice de deduplicación tiene {len(indice)} claves y el almacén menos leads: se reconstruye")
+        indice.vaciar()
+        existia = False
+    if not existia:
+        for lead in almacen.leer():
+            indice.agregar(lead[2], lead[3], lead[1])
+        # Los leads ya están en el almacén
+        indice.confirmar()
+        if len(indice):
+            print(f"🗂️ Índice de deduplicación reconstruido con {len(indice)} leads")
+    return indice
+
+
+def crear_enriquecedor(activar):
+    """Enriquecedor de resultados sin contactos, solo si se ha pedido (importa aiohttp)"""
+    if not activar:
+        return None
+    from enriquecimiento import Enriquecedor
+
+    return Enriquecedor()
+
+
+class LeadsExtractor:
+    def __init__(self, ruta_almacen=RUTA_ALMACEN, extraccion_masiva=True, crear_driver=crear_driver_chrome,
+                 ritmo=None, cache=None, punto_control=None, consulta_cprofile=None, ruta_indice=RUTA_INDICE,
+                 enriquecedor=None, memo=None):
+        self.crear_driver = crear_driver
+        # Sin crear_driver no se lanza navegador (modo de reproducción de páginas guardadas)
+        self.driver = None
+        if crear_driver:
+            with metricas.medir("arranque_driver"):
+                self.driver = crear_driver()
+        # Los trabajadores del pool y de la cola asignan una lista para recibir los leads
+        # de cada consulta; el resto solo cuenta los que encuentra
+        self.data = None
+        self.leads_encontrados = 0
+        self.extraccion_masiva = extraccion_masiva
+        self.tiempos_pagina = []
+        self.ritmo = ritmo or Ritmo()
+        self.cache = cache
+        self.punto_control = punto_control
+        self.consulta_cprofile = consulta_cprofile
+        self.enriquecedor = enriquecedor
+        self.memo = memo
+        # Sin ruta de almacén los leads solo se acumulan en memoria (trabajadores del pool)
+        self.almacen = AlmacenLeads(ruta_almacen) if ruta_almacen else None
+        # Sin índice no se deduplica al insertar (el colector del pool se encarga)
+        self.indice = abrir_indice(ruta_indice, self.almacen) if ruta_indice else None
+        # Con pipeline, la extracción y el guardado corren en sus propios hilos
+        self.pipeline = None
+        # Bytes y tiempo de carga de cada página abierta en el navegador
+        self.bytes_pagina = []
+        self.cargas_pagina = []
+
+    def iniciar_pipeline(self, trabajadores, capacidad=CAPACIDAD_COLA, usar_procesos=False):
+        self.pipeline = Pipeline(self, trabajadores=trabajadores, capacidad=capacidad, usar_procesos=usar_procesos)
+        return self.pipeline
+
+    def sesion_activa(self):
+        """Comprueba si la sesión del navegador sigue respondiendo"""
+        try:
+            # Si el proceso de chromedriver ha muerto no hace falta preguntarle
+            proceso = getattr(getattr(self.driver, "service", None), "process", None)
+            if proceso is not None and proceso.poll() is not None:
+                return False
+            self.driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def reiniciar_driver(self):
+        """Cierra el navegador actual (si sigue vivo) y arranca uno nuevo"""
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        with metricas.medir("arranque_driver"):
+            self.driver = self.crear_driver()
+
+    def esperar_condicion(self, paso, condicion, timeout=10):
+        """Espera a que se cumpla una condición del navegador y registra el tiempo esperado"""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        inicio = time.monotonic()
+        try:
+            return WebDriverWait(self.driver, timeout).until(condicion)
+        finally:
+            self.ritmo.registrar_espera(paso, time.monotonic() - inicio)
+
+    def medir_trafico(self):
+        """Registra los bytes transferidos desde la última medición y el tiempo de carga de la página"""
+        try:
+            recibidos, bloqueadas = trafico_de_registros(self.driver.get_log("performance"))
+            carga = self.driver.execute_script(SCRIPT_TIEMPO_CARGA)
+        except Exception:
+            # Navegadores sin registro de rendimiento: no hay nada que medir
+            return
+        self.bytes_pagina.append(recibidos)
+        metricas.contar("bytes_transferidos", recibidos)
+        metricas.contar("peticiones_bloqueadas", bloqueadas)
+        if carga:
+            self.cargas_pagina.append(carga / 1000)
+            metricas.observar("carga_pagina", carga / 1000)
+        print(f"📦 {recibidos / 1024:.0f} KB transferidos, {bloqueadas} peticiones bloqueadas"
+              + (f", carga en {carga:.0f} ms" if carga else ""))
+
+    def resumen_trafico(self):
+        """Media de bytes y de tiempo de carga por página abierta en el navegador"""
+        if not self.bytes_pagina:
+            return None
+        media_bytes = sum(self.bytes_pagina) / len(self.bytes_pagina)
+        resumen = f"{media_bytes / 1024:.0f} KB de media por página"
+        if self.cargas_pagina:
+            resumen += f", carga media {sum(self.cargas_pagina) / len(self.cargas_pagina) * 1000:.0f} ms"
+        return resumen + f" ({len(self.bytes_pagina)} páginas)"
+
+    def esperar_carga(self):
+        """Espera a que el documento actual termine de cargar"""
+        self.esperar_condicion(
+            "carga de página",
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
 
     def extraer_info_adicional(self, descripcion):
-        email = re.findall(r'[\w\.-]+@[\w\.-]+', descripcion)
-        # Adaptamos la búsqueda de direcciones para incluir formatos de ambos países
-        direccion = re.findall(r'(?:Calle|Avenida|Ruta|Boulevard|Av\.|Dr\.|Camino).*?(?=\s{2,}|$)', descripcion)
-        
-        # Detectar país
-        pais = self.detectar_pais(descripcion)
-        
+        """Email, dirección y país del texto con los patrones del motor de extracción"""
+        email = PATRON_EMAIL.search(descripcion)
+        direccion = PATRON_DIRECCION.search(descripcion)
         return {
-            'email': email[0] if email else '',
-            'direccion': direccion[0] if direccion else '',
-            'pais': pais
+            'email': email.group() if email else '',
+            'direccion': direccion.group() if direccion else '',
+            'pais': self.detectar_pais(descripcion)
         }
 
     def detectar_pais(self, texto):
-        """Detecta si el texto está relacionado con Paraguay o Uruguay"""
-        texto = texto.lower()
-        if any(keyword in texto for keyword in ["paraguay", "asunción", "asuncion", "py", "paraguayo", "paraguaya"]):
-            return "Paraguay"
-        elif any(keyword in texto for keyword in ["uruguay", "montevideo", "uy", "uruguayo", "uruguaya"]):
-            return "Uruguay"
-        
-        # Si no hay palabras clave, intentamos detectar por prefijos telefónicos
-        if "+595" in texto or "0595" in texto:
-            return "Paraguay"
-        elif "+598" in texto or "0598" in texto:
-            return "Uruguay"
-        
-        # Si no podemos determinar, usamos el término de búsqueda
-        return None  # Lo determinaremos por el término de búsqueda
+        """Detecta el país del texto por palabras clave o prefijos telefónicos (ver paises.py)"""
+        # Si no podemos determinarlo devuelve None y se usa el término de búsqueda
+        return detectar_pais(texto.lower())
 
     def manejar_recaptcha(self):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+
         try:
-            # Buscar el checkbox del reCAPTCHA
-            recaptcha = WebDriverWait(self.driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.recaptcha-checkbox-border"))
-            )
+            # Buscar el checkbox del reCAPTCHA en la página ya cargada
+            recaptchas = self.driver.find_elements(By.CSS_SELECTOR, "div.recaptcha-checkbox-border")
+            recaptcha = recaptchas[0] if recaptchas else None
             if (recaptcha and recaptcha.is_displayed()):
+                self.ritmo.penalizar("reCAPTCHA detectado")
                 print("Marcando reCAPTCHA...")
                 recaptcha.click()
-                time.sleep(2)  # Esperar a que se procese el reCAPTCHA
+                # Esperar a que se procese el reCAPTCHA
+                try:
+                    self.esperar_condicion("reCAPTCHA", EC.invisibility_of_element(recaptcha))
+                except Exception:
+                    pass
                 return True
         except Exception as e:
             print("No se encontró reCAPTCHA o no fue necesario marcarlo")
@@ -112,353 +397,492 @@ class LeadsExtractor:
 
     def normalizar_numero_telefono(self, numero, prefijo_pais):
         """Normaliza un número de teléfono al formato internacional correspondiente"""
-        # Eliminar espacios y caracteres especiales
-        numero = re.sub(r'[\s\-\(\)]', '', numero)
-        
-        # Si ya tiene formato internacional correcto, retornarlo
-        if numero.startswith(prefijo_pais):
-            return numero
-        
-        # Si empieza con 0 + el prefijo sin +
-        if numero.startswith('0' + prefijo_pais[1:]):
-            return '+' + numero[1:]
-        
-        # Si empieza con el prefijo sin +
-        elif numero.startswith(prefijo_pais[1:]):
-            return '+' + numero
-            
-        # Si es un número local (empieza con 0), añadir prefijo país
-        elif numero.startswith('0'):
-            return prefijo_pais + numero[1:]
-            
-        # Si es un número local sin 0, añadir prefijo país
-        else:
-            return prefijo_pais + numero
+        return normalizar_numero(numero, prefijo_pais)
 
     def es_numero_valido(self, numero, prefijo_pais):
         """Verifica si un número es válido para el país indicado"""
-        numero_limpio = re.sub(r'[\s\-\(\)]', '', numero)
-        # Verificar formato internacional y longitud
-        if prefijo_pais == "+595":  # Paraguay
-            patron = r'^\+595\d{9}$'  # +595 seguido de 9 dígitos
-        elif prefijo_pais == "+598":  # Uruguay
-            patron = r'^\+598\d{8}$'  # +598 seguido de 8 dígitos
-        return bool(re.match(patron, numero_limpio))
+        return es_numero_valido(numero, prefijo_pais)
 
     def extraer_numeros_telefono(self, texto, consulta):
         """Extrae números de teléfono del texto según el país de la consulta"""
-        # Determinar el país por la consulta
-        pais_consulta = "Paraguay" if "paraguay" in consulta.lower() else "Uruguay"
-        prefijo_pais = "+595" if pais_consulta == "Paraguay" else "+598"
-        
-        # Patrones de búsqueda según el país
-        if pais_consulta == "Paraguay":
-            patrones = [
-                r'(?:tel[eé]fono|tel|phone|movil|móvil|celular|contact|fijo|fax|whatsapp|wsp|wa)?\s*:?\s*(?:\+595|595|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){8,}',
-                r'(?:\+595|595|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){8,}',
-                r'\b(?:0|9)[\s\-\(\)]*(?:\d[\s\-\(\)]*){7,}'
-            ]
-            long_numero = 12  # +595 + 9 dígitos
-        else:  # Uruguay
-            patrones = [
-                r'(?:tel[eé]fono|tel|phone|movil|móvil|celular|contact|fijo|fax|whatsapp|wsp|wa)?\s*:?\s*(?:\+598|598|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){7,}',
-                r'(?:\+598|598|0)[\s\-\(\)]*(?:\d[\s\-\(\)]*){7,}',
-                r'\b(?:0|9)[\s\-\(\)]*(?:\d[\s\-\(\)]*){6,}'
-            ]
-            long_numero = 11  # +598 + 8 dígitos
-        
-        numeros_encontrados = []
-        texto = texto.lower()  # Convertir a minúsculas para mejor búsqueda
-        
-        for patron in patrones:
-            matches = re.findall(patron, texto, re.IGNORECASE)
-            for match in matches:
-                # Limpiar y normalizar el número
-                numero_limpio = re.sub(r'[^\d\+]', '', match)  # Mantener solo dígitos y +
-                numero_normalizado = self.normalizar_numero_telefono(numero_limpio, prefijo_pais)
-                
-                # Verificar longitud válida
-                if len(re.sub(r'[^\d]', '', numero_normalizado)) == long_numero:
-                    numeros_encontrados.append(numero_normalizado)
-        
-        return list(set(numeros_encontrados))  # Eliminar duplicados
+        return motor_para_consulta(consulta).extraer_telefonos(texto.lower())
 
     def extraer_whatsapp(self, texto):
-        """Extrae específicamente menciones a WhatsApp"""
-        texto = texto.lower()
-        # Buscar patrones específicos de WhatsApp
-        patrones_whatsapp = [
-            r'(?:whatsapp|wsp|wa|whats app)[\s\:]*(?:\+?[0-9][\s\-\(\)]*){7,}',
-            r'(?:contacto|contactar|escribir)(?:\s\w+){0,3}\s(?:al|por)\s(?:whatsapp|wsp|wa)',
-            r'(?:escríbenos|escribenos|contáctenos|contactenos)(?:\s\w+){0,3}\s(?:whatsapp|wsp|wa)'
-        ]
-        
-        es_whatsapp = False
-        for patron in patrones_whatsapp:
-            if re.search(patron, texto, re.IGNORECASE):
-                es_whatsapp = True
-                break
-                
-        return es_whatsapp
+        """Indica si el texto menciona WhatsApp como medio de contacto"""
+        return bool(PATRON_WHATSAPP.search(texto.lower()))
 
-    def buscar_numeros(self, consulta):
-        print(f"\n🔍 Iniciando búsqueda para: {consulta}")
+    def extraer_resultados_pagina(self):
+        """Extrae título, enlace y texto de todos los resultados de la página en una sola llamada"""
+        resultados = self.driver.execute_script(SCRIPT_EXTRAER_RESULTADOS, SELECTOR_RESULTADOS, SELECTORES_TEXTO)
+        for resultado in resultados:
+            if resultado['titulo'] is None:
+                resultado['titulo'] = "Sin título"
+        return resultados
+
+    def extraer_resultados_elementos(self):
+        """Extrae los resultados elemento a elemento, con una llamada a chromedriver por consulta al DOM"""
+        from selenium.webdriver.common.by import By
+
+        resultados = []
+        for resultado in self.driver.find_elements(By.CSS_SELECTOR, SELECTOR_RESULTADOS):
+            try:
+                titulo = resultado.find_element(By.CSS_SELECTOR, "h3").text
+            except:
+                titulo = "Sin título"
+
+            try:
+                enlace = resultado.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
+            except:
+                enlace = ""
+
+            # Extraer todo el texto del resultado
+            texto_completo = ""
+            for selector in SELECTORES_TEXTO:
+                try:
+                    for elem in resultado.find_elements(By.CSS_SELECTOR, selector):
+                        texto = elem.text.strip()
+                        if texto:
+                            texto_completo += " " + texto
+                except:
+                    continue
+
+            resultados.append({'titulo': titulo, 'enlace': enlace, 'texto': texto_completo})
+        return resultados
+
+    def procesar_resultado(self, titulo, enlace, texto_completo, consulta):
+        """Extrae los contactos de un resultado y guarda los leads. Devuelve cuántos se añadieron"""
+        print(f"\n🔍 Analizando: {titulo[:100]}")
+
+        if not texto_completo:
+            print("⚠️ No se pudo extraer texto del resultado")
+            return 0
+
+        print(f"📝 Texto extraído: {texto_completo[:150]}...")
+
+        info_adicional = self.consultar_memo(enlace, texto_completo, consulta)
+        if info_adicional is not None:
+            if not info_adicional['telefonos'] and not info_adicional['email']:
+                return 0
+            return self.registrar_leads(titulo, enlace, consulta, info_adicional)
+
+        # Teléfonos, email, dirección, país y WhatsApp en una sola pasada
+        with metricas.medir("extraccion_contactos"):
+            info_adicional = motor_para_consulta(consulta).extraer(texto_completo)
+        if self.memo is not None:
+            self.memo.guardar(enlace, texto_completo, consulta, info_adicional)
+        numeros = info_adicional['telefonos']
+
+        if not numeros and not info_adicional['email']:
+            print("❌ No se encontraron números ni emails en este resultado")
+            if self.enriquecedor is not None:
+                # Buscar los contactos en la web de la empresa, sin bloquear el navegador
+                self.enriquecedor.enviar(titulo, enlace, consulta)
+            return 0
+
+        print(f"✅ Encontrado(s) {len(numeros)} número(s) y/o email:")
+        return self.registrar_leads(titulo, enlace, consulta, info_adicional)
+
+    def procesar_resultados(self, resultados, consulta):
+        """Procesa los resultados de una página o, con pipeline, los encola sin esperar.
+
+        Devuelve cuántos leads se añadieron (siempre 0 con pipeline: se guardan después)
+        """
+        leads_agregados = 0
+        for resultado in resultados:
+            if self.pipeline is not None:
+                info = self.consultar_memo(resultado['enlace'], resultado['texto'], consulta)
+                if info is not None:
+                    if info['telefonos'] or info['email']:
+                        self.pipeline.entregar(resultado['titulo'], resultado['enlace'], consulta, info)
+                    continue
+                self.pipeline.producir(resultado['titulo'], resultado['enlace'], resultado['texto'], consulta)
+                continue
+            try:
+                leads_agregados += self.procesar_resultado(
+                    resultado['titulo'], resultado['enlace'], resultado['texto'], consulta
+                )
+            except Exception as e:
+                print(f"⚠️ Error al procesar resultado: {str(e)}")
+        return leads_agregados
+
+    def consultar_memo(self, enlace, texto, consulta):
+        """Contactos ya extraídos del mismo resultado en esta u otra consulta, o None"""
+        if self.memo is None or not texto:
+            return None
+        info = self.memo.obtener(enlace, texto, consulta)
+        if info is None:
+            metricas.contar("memo_fallos")
+            return None
+        metricas.contar("memo_aciertos")
+        print("♻️ Resultado ya procesado en otra consulta: se reutilizan sus contactos")
+        return info
+
+    def registrar_leads(self, titulo, enlace, consulta, info_adicional):
+        """Crea y guarda un lead por número (o uno solo con el email). Devuelve cuántos se añadieron"""
+        nuevos = self.construir_leads(titulo, enlace, consulta, info_adicional)
+        # Guardar inmediatamente, todos los del resultado en una sola transacción
+        self.guardar_lote(nuevos)
+        return len(nuevos)
+
+    def construir_leads(self, titulo, enlace, consulta, info_adicional):
+        """Crea un lead por número (o uno solo con el email) descartando los ya conocidos, sin guardarlos"""
+        numeros = info_adicional['telefonos']
+        es_whatsapp = info_adicional['whatsapp']
+
+        # Si hay email pero no números, agregar un registro con el email
+        # Para cada número encontrado, crear un registro
+        nuevos = []
+        for numero in numeros or [""]:
+            # Descartar los leads ya conocidos en esta ejecución o en las anteriores
+            if self.indice is not None and not self.indice.agregar(numero, info_adicional['email'], enlace):
+                print(f"  🔁 Lead ya conocido: {numero or info_adicional['email']}")
+                metricas.contar("duplicados")
+                continue
+
+            nuevo_lead = Lead(
+                titulo,
+                enlace,
+                numero,
+                info_adicional['email'],
+                info_adicional['direccion'],
+                # Los memos anteriores no traen 'paises'
+                info_adicional.get('paises', {}).get(numero, info_adicional['pais']),
+                consulta,
+                "Sí" if es_whatsapp else "No",
+                time.strftime("%Y-%m-%d")
+            )
+
+            if self.data is not None:
+                self.data.append(nuevo_lead)
+            self.leads_encontrados += 1
+            nuevos.append(nuevo_lead)
+            metricas.contar("leads")
+
+            if numero:
+                print(f"  📞 Número: {numero} {'(WhatsApp)' if es_whatsapp else ''}")
+            if info_adicional['email']:
+                print(f"  📧 Email: {info_adicional['email']}")
+
+        return nuevos
+
+    def abrir_busqueda(self, consulta):
+        """Abre Google y lanza la búsqueda desde el cuadro de búsqueda"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support import expected_conditions as EC
+
+        self.ritmo.esperar("entre consultas")
         self.driver.get("https://www.google.com")
-        time.sleep(2)
+        self.esperar_carga()
 
+        # Aceptar cookies de Google si aparece el cartel
         try:
-            # Aceptar cookies de Google si aparece el cartel
+            accept_button = self.driver.find_element(By.CSS_SELECTOR, "div.QS5gu.sy4vM")
+            accept_button.click()
+            print("✅ Cookies aceptadas")
+            self.esperar_condicion("cookies", EC.invisibility_of_element(accept_button), timeout=5)
+        except Exception as e:
+            print("ℹ️ No se encontró el cartel de cookies o ya fue aceptado")
+
+        # Manejar reCAPTCHA si aparece
+        if self.manejar_recaptcha():
+            print("✅ reCAPTCHA manejado correctamente")
+
+        # Esperar a que el cuadro de búsqueda esté disponible
+        search_box = self.esperar_condicion(
+            "cuadro de búsqueda", EC.presence_of_element_located((By.NAME, "q"))
+        )
+        search_box.clear()
+        search_box.send_keys(consulta_busqueda(consulta))
+        search_box.send_keys(Keys.RETURN)
+
+    def abrir_pagina(self, consulta, pagina, pagina_actual, resultado_actual):
+        """Lleva el navegador a la página de resultados indicada.
+
+        Desde la página anterior se pulsa "Siguiente"; para la primera se usa el
+        cuadro de búsqueda y, al reanudar a mitad de una consulta, se salta
+        directamente con el parámetro start. Devuelve el primer resultado de la
+        página, o None si no hay página siguiente. Cualquier otro fallo al
+        navegar se propaga para que la página cuente como no procesada.
+        """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+
+        if pagina == 0:
+            self.abrir_busqueda(consulta)
+        elif pagina_actual is not None and pagina == pagina_actual + 1:
             try:
-                accept_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "div.QS5gu.sy4vM"))
+                # Actualizar selector para el botón "Siguiente"
+                siguiente = self.esperar_condicion(
+                    "botón siguiente",
+                    EC.element_to_be_clickable((By.XPATH, "//span[contains(@class, 'oeN89d')]"))
                 )
-                accept_button.click()
-                print("✅ Cookies aceptadas")
-                time.sleep(1)
+            except TimeoutException:
+                print("ℹ️ No hay más páginas de resultados")
+                return None
+            try:
+                self.ritmo.esperar("entre páginas")
+                siguiente.click()
+                print("➡️ Navegando a la siguiente página...")
+                # La página actual se descarta cuando empieza a cargar la siguiente
+                self.esperar_condicion("cambio de página", EC.staleness_of(resultado_actual))
+                self.esperar_carga()
             except Exception as e:
-                print("ℹ️ No se encontró el cartel de cookies o ya fue aceptado")
+                print(f"⚠️ No se pudo navegar a la siguiente página: {str(e)}")
+                raise
 
-            # Manejar reCAPTCHA si aparece
+            # Verificar si aparece reCAPTCHA después de la navegación
+            if self.manejar_recaptcha():
+                print("✅ reCAPTCHA manejado después de cambio de página")
+        else:
+            self.ritmo.esperar("entre páginas")
+            print(f"⏩ Saltando directamente a la página {pagina + 1}...")
+            self.driver.get(
+                f"https://www.google.com/search?q={quote_plus(consulta_busqueda(consulta))}&start={pagina * 10}"
+            )
+            self.esperar_carga()
             if self.manejar_recaptcha():
-                print("✅ reCAPTCHA manejado correctamente")
+                print("✅ reCAPTCHA manejado después de cambio de página")
 
-            # Esperar a que el cuadro de búsqueda esté disponible
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "q"))
+        # Esperar a que los resultados estén disponibles - usando selector más amplio
+        try:
+            primer_resultado = self.esperar_condicion(
+                "resultados", EC.presence_of_element_located((By.CSS_SELECTOR, SELECTOR_RESULTADOS))
             )
-            search_box.clear()
-            # Mejorar la consulta para encontrar contactos
-            search_query = f'{consulta} AND ("contacto" OR "teléfono" OR "telefono" OR "contact" OR "WhatsApp" OR "correo" OR "email")'
-            search_box.send_keys(search_query)
-            search_box.send_keys(Keys.RETURN)
-            time.sleep(3)
-
-            leads_en_pagina_actual = 0
-            # Procesar 5 páginas de resultados
-            for pagina in range(5):
-                print(f"\n📄 Procesando página {pagina + 1} de 5...")
+        except Exception:
+            self.ritmo.penalizar("Página sin resultados")
+            raise
+        self.ritmo.recuperar()
+        return primer_resultado
+
+    def buscar_numeros(self, consulta, paginas=range(PAGINAS_POR_CONSULTA)):
+        """Procesa las páginas de resultados de una consulta.
+
+        Las páginas ya registradas en el punto de control se saltan y las que
+        están en la caché se procesan sin navegador. Devuelve False si alguna
+        página falló (CAPTCHA, timeout...) o la búsqueda se interrumpió por un
+        error general: la consulta solo está completa cuando todas sus páginas
+        se han procesado o se ha llegado a la última página de resultados.
+        """
+        print(f"\n🔍 Iniciando búsqueda para: {consulta}")
+        pagina_navegador = None   # página de esta consulta que muestra el navegador
+        primer_resultado = None
+        fallidas = []
+
+        try:
+            for pagina in paginas:
+                print(f"\n📄 Procesando página {pagina + 1} de {PAGINAS_POR_CONSULTA}...")
+
+                if self.punto_control and pagina in self.punto_control.paginas_completadas(consulta):
+                    print("⏭️ Página ya procesada en una ejecución anterior")
+                    continue
 
                 try:
-                    # Esperar a que los resultados estén disponibles - usando selector más amplio
-                    resultados = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.g, div.hlcw0c"))
-                    )
-                    
-                    print(f"📊 Analizando {len(resultados)} resultados en esta página")
-                    leads_en_pagina_actual = 0
-                    
-                    for i, resultado in enumerate(resultados, 1):
-                        try:
-                            # Extraer título y enlace
-                            try:
-                                titulo_elem = resultado.find_element(By.CSS_SELECTOR, "h3")
-                                titulo = titulo_elem.text
-                                print(f"\n🔍 Analizando: {titulo[:100]}")
-                            except:
-                                titulo = "Sin título"
-                                print("\n🔍 Analizando resultado sin título")
-                            
-                            try:
-                                enlace_elem = resultado.find_element(By.CSS_SELECTOR, "a")
-                                enlace = enlace_elem.get_attribute("href")
-                            except:
-                                enlace = ""
-                            
-                            # Extraer todo el texto del resultado
-                            texto_completo = ""
-                            
-                            # Intentar extraer texto de diferentes elementos
-                            selectores = [
-                                "div.VwiC3b",        # Descripción principal
-                                "div.kb0PBd",        # Información adicional
-                                "div.dVsXxc",        # Contenedor de detalles
-                                "div.B1uW2d",        # Datos de contacto
-                                "div.YrbPuc",        # Información de la empresa
-                                "div.X7NTVe",        # Detalles adicionales
-                                "span"               # Cualquier otro texto
-                            ]
-                            
-                            for selector in selectores:
-                                try:
-                                    elementos = resultado.find_elements(By.CSS_SELECTOR, selector)
-                                    for elem in elementos:
-                                        texto = elem.text.strip()
-                                        if texto:
-                                            texto_completo += " " + texto
-                                except:
-                                    continue
-                            
-                            if texto_completo:
-                                print(f"📝 Texto extraído: {texto_completo[:150]}...")
-                                
-                                # Buscar números de teléfono
-                                numeros = self.extraer_numeros_telefono(texto_completo, consulta)
-                                
-                                # Extraer información adicional
-                                info_adicional = self.extraer_info_adicional(texto_completo)
-                                if not info_adicional['pais']:
-                                    info_adicional['pais'] = "Paraguay" if "paraguay" in consulta.lower() else "Uruguay"
-                                
-                                # Determinar si algún número es WhatsApp
-                                es_whatsapp = self.extraer_whatsapp(texto_completo)
-                                
-                                if numeros or info_adicional['email']:
-                                    print(f"✅ Encontrado(s) {len(numeros)} número(s) y/o email:")
-                                    
-                                    # Si hay email pero no números, agregar un registro con el email
-                                    if info_adicional['email'] and not numeros:
-                                        nuevo_lead = [
-                                            titulo,
-                                            enlace,
-                                            "",  # No hay número
-                                            info_adicional['email'],
-                                            info_adicional['direccion'],
-                                            info_adicional['pais'],
-                                            consulta,
-                                            "Sí" if es_whatsapp else "No",
-                                            time.strftime("%Y-%m-%d")
-                                        ]
-                                        
-                                        self.data.append(nuevo_lead)
-                                        leads_en_pagina_actual += 1
-                                        print(f"  📧 Email: {info_adicional['email']}")
-                                    
-                                    # Para cada número encontrado, crear un registro
-                                    for numero in numeros:
-                                        nuevo_lead = [
-                                            titulo,
-                                            enlace,
-                                            numero,
-                                            info_adicional['email'],
-                                            info_adicional['direccion'],
-                                            info_adicional['pais'],
-                                            consulta,
-                                            "Sí" if es_whatsapp else "No",
-                                            time.strftime("%Y-%m-%d")
-                                        ]
-                                        
-                                        self.data.append(nuevo_lead)
-                                        leads_en_pagina_actual += 1
-                                        
-                                        print(f"  📞 Número: {numero} {'(WhatsApp)' if es_whatsapp else ''}")
-                                        if info_adicional['email']:
-                                            print(f"  📧 Email: {info_adicional['email']}")
-                                        
-                                        # Guardar inmediatamente
-                                        self.guardar_datos_incrementalmente()
-                                else:
-                                    print("❌ No se encontraron números ni emails en este resultado")
+                    resultados = self.cache.obtener(consulta, pagina) if self.cache else None
+                    if resultados is not None:
+                        print("♻️ Resultados recuperados de la caché")
+                        inicio_pagina = time.perf_counter()
+                    else:
+                        with metricas.medir("navegacion"):
+                            primer_resultado = self.abrir_pagina(consulta, pagina, pagina_navegador,
+                                                                 primer_resultado)
+                        if primer_resultado is None:
+                            break
+                        pagina_navegador = pagina
+                        self.medir_trafico()
+
+                        inicio_pagina = time.perf_counter()
+                        with metricas.medir("extraccion_dom"):
+                            if self.extraccion_masiva:
+                                resultados = self.extraer_resultados_pagina()
                             else:
-                                print("⚠️ No se pudo extraer texto del resultado")
-                            
-                        except Exception as e:
-                            print(f"⚠️ Error al procesar resultado: {str(e)}")
-                            continue
+                                resultados = self.extraer_resultados_elementos()
+                        if self.cache:
+                            self.cache.guardar(consulta, pagina, resultados)
+
+                    print(f"📊 Analizando {len(resultados)} resultados en esta página")
+                    leads_en_pagina_actual = self.procesar_resultados(resultados, consulta)
+
+                    duracion_pagina = time.perf_counter() - inicio_pagina
+                    self.tiempos_pagina.append(duracion_pagina)
+                    metricas.observar("procesamiento_pagina", duracion_pagina)
+                    metricas.contar("paginas")
+                    metricas.contar("resultados", len(resultados))
+                    # Con pipeline los leads de la página aún pueden estar en cola: la página
+                    # no se da por hecha hasta terminar la consulta (ejecutar espera al pipeline)
+                    if self.punto_control and self.pipeline is None:
+                        self.punto_control.marcar_pagina(consulta, pagina)
 
                     print(f"\n✨ Página {pagina + 1} completada")
-                    print(f"📊 Leads encontrados en esta página: {leads_en_pagina_actual}")
-                    print(f"📈 Total de leads acumulados: {len(self.data)}")
-
-                    if pagina < 4:  # No intentar ir a siguiente en la última página
-                        try:
-                            # Actualizar selector para el botón "Siguiente"
-                            siguiente = WebDriverWait(self.driver, 10).until(
-                                EC.element_to_be_clickable((By.XPATH, "//span[contains(@class, 'oeN89d')]"))
-                            )
-                            siguiente.click()
-                            print("➡️ Navegando a la siguiente página...")
-                            time.sleep(3)
-                        except Exception as e:
-                            print(f"⚠️ No se pudo navegar a la siguiente página: {str(e)}")
-                            break
+                    print(f"⏱️ Tiempo de procesamiento de la página: {duracion_pagina * 1000:.0f} ms")
+                    if self.pipeline is not None:
+                        print(f"🧵 Colas del pipeline: {self.pipeline.resumen_colas()}")
+                    else:
+                        print(f"📊 Leads encontrados en esta página: {leads_en_pagina_actual}")
+                    print(f"📈 Total de leads acumulados: {self.leads_encontrados}")
 
-                        # Verificar si aparece reCAPTCHA después de la navegación
-                        if self.manejar_recaptcha():
-                            print("✅ reCAPTCHA manejado después de cambio de página")
+                    # Recoger lo que el enriquecedor haya terminado mientras tanto
+                    self.procesar_enriquecidos()
 
                 except Exception as e:
+                    fallidas.append(pagina)
                     print(f"❌ Error al procesar la página {pagina + 1}: {str(e)}")
                     print(f"Detalles del error: {str(e)}")
 
-                # Pequeña pausa entre páginas para evitar bloqueos
-                time.sleep(2)
-
         except Exception as e:
             print(f"❌ Error general al buscar {consulta}: {str(e)}")
+            return False
+        if fallidas:
+            print(f"⚠️ '{consulta}' queda pendiente: fallaron las páginas "
+                  f"{', '.join(str(pagina + 1) for pagina in fallidas)}")
+            return False
+        return True
 
-    def guardar_datos_incrementalmente(self):
-        """Guarda los datos en el Excel después de cada nuevo lead encontrado"""
+    def procesar_enriquecidos(self, esperar=False):
+        """Guarda los leads encontrados por el enriquecedor en la web de cada resultado"""
+        if self.enriquecedor is None:
+            return 0
+        leads_agregados = 0
+        for titulo, enlace, consulta, info_adicional in self.enriquecedor.drenar(esperar):
+            print(f"\n🌐 Contactos encontrados en la web de: {titulo[:100]}")
+            if self.pipeline is not None:
+                # Solo el sumidero del pipeline escribe en el almacén y el índice
+                self.pipeline.entregar(titulo, enlace, consulta, info_adicional)
+                continue
+            leads_agregados += self.registrar_leads(titulo, enlace, consulta, info_adicional)
+        return leads_agregados
+
+    def buscar_numeros_perfilado(self, consulta):
+        """buscar_numeros bajo cProfile si es la consulta elegida con --cprofile-consulta"""
+        if consulta != self.consulta_cprofile:
+            return self.buscar_numeros(consulta)
+
+        perfilador = cProfile.Profile()
+        completada = perfilador.runcall(self.buscar_numeros, consulta)
+        ruta = "cprofile_" + re.sub(r'\W+', '_', consulta) + ".prof"
+        perfilador.dump_stats(ruta)
+        print(f"🧪 Perfil de cProfile de '{consulta}' guardado en '{ruta}'")
+        pstats.Stats(perfilador).sort_stats("cumulative").print_stats(20)
+        return completada
+
+    def guardar_datos_incrementalmente(self, nuevo_lead):
+        """Confirma el nuevo lead en el almacén de solo inserción"""
+        self.guardar_lote([nuevo_lead])
+
+    def guardar_lote(self, leads):
+        """Confirma varios leads en una sola transacción y después sus claves en el índice.
+
+        Si el guardado falla, las claves se descartan: esos leads se podrán
+        volver a encontrar en lugar de quedar como conocidos sin estar guardados.
+        """
         try:
-            if not self.data:  # Si no hay datos, no intentar guardar
-                return
-                
-            df = pd.DataFrame(self.data, columns=[
-                "Empresa/Entidad",
-                "Enlace",
-                "Teléfono",
-                "Email",
-                "Dirección",
-                "País",
-                "Sector",
-                "WhatsApp",
-                "Fecha Extracción"
-            ])
-            
-            # Eliminar duplicados basados en el número de teléfono y email
-            df = df.drop_duplicates(subset=['Teléfono', 'Email'], keep='first')
-            
-            # Guardar en Excel con formato
-            with pd.ExcelWriter('leads_contactos.xlsx', engine='openpyxl', mode='w') as writer:
-                df.to_excel(writer, index=False, sheet_name='Leads')
-                workbook = writer.book
-                worksheet = writer.sheets['Leads']
-                
-                # Dar formato a las columnas
-                for column in worksheet.columns:
-                    max_length = 0
-                    column = [cell for cell in column]
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(cell.value)
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
-            
-            print(f"💾 Base de datos actualizada - Total: {len(df)} leads únicos")
-            
+            if self.almacen is not None:
+                with metricas.medir("guardado"):
+                    self.almacen.agregar_lote(leads)
         except Exception as e:
             print(f"❌ Error al guardar datos: {str(e)}")
+            if self.indice is not None:
+                self.indice.descartar()
+            return
+        if self.indice is not None:
+            self.indice.confirmar()
+
+    def exportar_excel(self, ruta=RUTA_EXCEL):
+        """Exporta los leads únicos del almacén al Excel con formato (o a CSV/Parquet según la extensión)"""
+        try:
+            total = self.almacen.exportar(ruta)
+            print(f"💾 Exportado a '{ruta}' - Total: {total} leads únicos")
+        except Exception as e:
+            print(f"❌ Error al exportar datos: {str(e)}")
 
     def ejecutar(self):
         print("\n🚀 Iniciando extracción de leads...")
-        print(f"🌎 Países objetivo: Paraguay (+595) y Uruguay (+598)")
+        print("🌎 Países objetivo: " + ", ".join(
+            f"{pais} ({PAISES[pais]['prefijo']})" for pais in paises_por_prefijo(PREFIJOS)
+        ))
         print(f"🎯 Total de términos a buscar: {len(SECTORES)}")
         
         try:
             total_leads = 0
+            pendientes = []
             for i, sector in enumerate(SECTORES, 1):
                 print(f"\n📊 Progreso: Término {i}/{len(SECTORES)}")
-                
+
+                if self.punto_control and self.punto_control.sector_completado(sector):
+                    print(f"⏭️ '{sector}' ya se completó en una ejecución anterior")
+                    continue
+
+                # Reutilizar la sesión entre consultas, salvo que el navegador haya caído
+                if self.driver is not None and not self.sesion_activa():
+                    print("🔄 El navegador dejó de responder: reiniciando la sesión")
+                    self.reiniciar_driver()
+
                 # Simplificamos la query para ser más directa
-                self.buscar_numeros(sector)
+                with metricas.medir("consulta"):
+                    completada = self.buscar_numeros_perfilado(sector)
+                metricas.contar("consultas")
+                if self.pipeline is not None:
+                    self.pipeline.esperar()
+                if not completada:
+                    pendientes.append(sector)
+                elif self.punto_control:
+                    self.punto_control.marcar_sector(sector)
                 
                 # Actualizar contador total
-                if len(self.data) > total_leads:
-                    nuevos_leads = len(self.data) - total_leads
+                if self.leads_encontrados > total_leads:
+                    nuevos_leads = self.leads_encontrados - total_leads
                     print(f"✨ Encontrados {nuevos_leads} nuevos leads en esta búsqueda")
-                    total_leads = len(self.data)
-                
-                print(f"⏳ Esperando antes de la siguiente búsqueda...")
-                time.sleep(5)
+                    total_leads = self.leads_encontrados
+
+            # Esperar a las webs que falten por descargar
+            self.procesar_enriquecidos(esperar=True)
+            if self.pipeline is not None:
+                self.pipeline.esperar()
+            if self.leads_encontrados > total_leads:
+                print(f"🌐 Encontrados {self.leads_encontrados - total_leads} leads más en las webs de los resultados")
+                total_leads = self.leads_encontrados
+
+            if pendientes:
+                # El punto de control se conserva para repetir solo las páginas que fallaron
+                print(f"⚠️ Términos con páginas pendientes: {', '.join(pendientes)}")
+            elif self.punto_control:
+                # Ejecución completa: la próxima empezará desde el principio
+                self.punto_control.borrar()
 
             if total_leads == 0:
-                print("\n⚠️ No se encontraron resultados")
+                print("\n⚠️ No se encontraron leads nuevos")
             else:
                 print(f"\n✅ Proceso finalizado exitosamente")
                 print(f"📊 Total de leads únicos encontrados: {total_leads}")
-                print("📁 Datos guardados en 'leads_contactos.xlsx'")
+                self.exportar_excel()
+                print(f"📁 Datos guardados en '{RUTA_EXCEL}'")
+
+            if self.tiempos_pagina:
+                media = sum(self.tiempos_pagina) / len(self.tiempos_pagina)
+                print(f"⏱️ Tiempo medio de procesamiento por página: {media * 1000:.0f} ms "
+                      f"({len(self.tiempos_pagina)} páginas)")
+
+            trafico = self.resumen_trafico()
+            if trafico:
+                print(f"📦 Tráfico del navegador: {trafico}")
+
+            print("⏳ Tiempo de espera por paso:")
+            for linea in self.ritmo.resumen():
+                print(f"  {linea}")
+
+            if self.cache:
+                print(f"♻️ Caché de resultados: {self.cache.resumen()}")
+            if self.memo is not None:
+                print(f"🧠 Memo de resultados: {self.memo.resumen()}")
+            if self.enriquecedor is not None:
+                print(f"🌐 Enriquecimiento: {self.enriquecedor.resumen()}")
+            if self.indice is not None:
+                print(f"🗂️ Leads conocidos en el índice de deduplicación: {len(self.indice)}")
+            if self.pipeline is not None:
+                print("🧵 Pipeline:")
+                for linea in self.pipeline.resumen():
+                    print(f"  {linea}")
         
         except Exception as e:
             print(f"\n❌ Error durante la ejecución: {str(e)}")
@@ -466,7 +890,155 @@ class LeadsExtractor:
         finally:
             print("\n👋 Cerrando el navegador...")
             self.driver.quit()
+            if self.pipeline is not None:
+                self.pipeline.cerrar()
+            if self.almacen is not None:
+                self.almacen.cerrar()
+            if self.indice is not None:
+                self.indice.cerrar()
+            if self.cache is not None:
+                self.cache.cerrar()
+            if self.memo is not None:
+                self.memo.cerrar()
+            if self.enriquecedor is not None:
+                self.enriquecedor.cerrar()
 
 if __name__ == "__main__":
-    extractor = LeadsExtractor()
-    extractor.ejecutar()
+    parser = argparse.ArgumentParser(description="Extractor de leads desde Google Search")
+    parser.add_argument("--exportar", nargs="?", const=RUTA_EXCEL, metavar="RUTA",
+                        help="Exporta el almacén de leads sin lanzar el navegador: al Excel por defecto, "
+                             "o a .csv o .parquet según la extensión de RUTA")
+    parser.add_argument("--revalidar", metavar="ENTRADA",
+                        help="Vuelve a normalizar y validar los teléfonos de un Excel o CSV de leads con las reglas "
+                             "actuales, sin navegador, y escribe los leads únicos en --salida")
+    parser.add_argument("--salida", metavar="RUTA",
+                        help="Fichero de salida de --revalidar (.xlsx, .csv o .parquet; por defecto "
+                             "<entrada>_revalidado con la misma extensión)")
+    parser.add_argument("--extraccion-elementos", action="store_true",
+                        help="Extrae los resultados elemento a elemento en lugar de con una sola llamada por página")
+    parser.add_argument("--trabajadores", type=int, default=1,
+                        help="Número de navegadores en paralelo, cada uno en su propio proceso")
+    parser.add_argument("--reproducir", nargs="+", metavar="RUTA",
+                        help="Procesa páginas de resultados guardadas (ficheros .html o directorios) sin navegador")
+    parser.add_argument("--consulta",
+                        help="Término de búsqueda de las páginas reproducidas (por defecto, el de cada página)")
+    parser.add_argument("--intervalo-minimo", type=float, default=INTERVALO_MINIMO,
+                        help="Segundos mínimos entre peticiones a Google (se amplía tras un CAPTCHA)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="No reutiliza ni guarda resultados en la caché de páginas")
+    parser.add_argument("--ttl-cache", type=float, default=TTL_CACHE / 3600,
+                        help="Horas durante las que una página en caché se considera vigente")
+    parser.add_argument("--sin-memo", action="store_true",
+                        help="Vuelve a extraer los resultados ya procesados en otras consultas o ejecuciones")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Descarta el punto de control y empieza desde el primer término")
+    parser.add_argument("--metricas", metavar="DIRECTORIO",
+                        help="Activa la instrumentación y escribe perfil.json y metricas.prom en el directorio")
+    parser.add_argument("--cprofile-consulta", metavar="SECTOR",
+                        help="Ejecuta bajo cProfile la búsqueda de este término y guarda el perfil")
+    parser.add_argument("--enriquecer", action="store_true",
+                        help="Busca contactos en la web (y /contacto) de los resultados que no los muestran")
+    parser.add_argument("--pipeline", type=int, default=0, metavar="TRABAJADORES",
+                        help="Extrae y guarda en segundo plano con este número de trabajadores de extracción")
+    parser.add_argument("--capacidad-cola", type=int, default=CAPACIDAD_COLA,
+                        help="Resultados que pueden esperar en cada cola del pipeline antes de frenar al navegador")
+    parser.add_argument("--extraccion-procesos", action="store_true",
+                        help="Los trabajadores de extracción del pipeline usan procesos en lugar de hilos")
+    parser.add_argument("--cola", metavar="DIRECTORIO",
+                        help="Reparte los trabajos (término, páginas) en una cola compartida en el directorio; "
+                             "se puede lanzar a la vez desde varios procesos o máquinas")
+    parser.add_argument("--paginas-por-trabajo", type=int, default=PAGINAS_POR_TRABAJO,
+                        help="Páginas de resultados de cada trabajo de la cola")
+    parser.add_argument("--lease", type=float, default=DURACION_LEASE,
+                        help="Segundos sin latido tras los que otro proceso puede reclamar un trabajo de la cola")
+    parser.add_argument("--navegador-ligero", action="store_true",
+                        help="Chrome sin ventana, con tamaño fijo y sin imágenes, fuentes ni rastreadores")
+    args = parser.parse_args()
+    crear_driver = partial(crear_driver_chrome, ligero=True) if args.navegador_ligero else crear_driver_chrome
+
+    if args.metricas:
+        metricas.activar()
+
+    punto_control = PuntoControl()
+    if args.reiniciar:
+        punto_control.borrar()
+
+    if args.exportar:
+        almacen = AlmacenLeads()
+        print(f"💾 Exportado a '{args.exportar}' - Total: {almacen.exportar(args.exportar)} leads únicos")
+        almacen.cerrar()
+    elif args.revalidar:
+        from revalidacion import revalidar
+
+        base, extension = os.path.splitext(args.revalidar)
+        salida = args.salida or f"{base}_revalidado{extension}"
+        estadisticas = revalidar(args.revalidar, salida)
+        print(f"✅ Revalidadas {estadisticas['filas']} filas: {estadisticas['corregidos']} teléfonos corregidos, "
+              f"{estadisticas['invalidos']} no válidos, {estadisticas['sin_contacto']} filas sin contacto")
+        print(f"💾 Exportado a '{salida}' - Total: {estadisticas['escritos']} leads únicos")
+    elif args.reproducir:
+        from reproduccion import reproducir_paginas
+
+        extractor = LeadsExtractor(crear_driver=None, enriquecedor=crear_enriquecedor(args.enriquecer))
+        if args.pipeline:
+            extractor.iniciar_pipeline(args.pipeline, args.capacidad_cola, args.extraccion_procesos)
+        estadisticas = reproducir_paginas(extractor, args.reproducir, args.consulta)
+        leads_previos = extractor.leads_encontrados
+        extractor.procesar_enriquecidos(esperar=True)
+        if extractor.pipeline is not None:
+            extractor.pipeline.esperar()
+            print("🧵 Pipeline:")
+            for linea in extractor.pipeline.resumen():
+                print(f"  {linea}")
+            extractor.pipeline.cerrar()
+        estadisticas['leads'] += extractor.leads_encontrados - leads_previos
+        if extractor.enriquecedor is not None:
+            extractor.enriquecedor.cerrar()
+        print(f"\n✅ Reproducidas {estadisticas['paginas']} páginas: "
+              f"{estadisticas['resultados']} resultados, {estadisticas['leads']} leads")
+        extractor.exportar_excel()
+        extractor.almacen.cerrar()
+        extractor.indice.cerrar()
+    elif args.cola:
+        from cola_trabajos import ColaTrabajos, ejecutar_cola
+
+        ruta_cola = ejecutar_cola(args.cola, SECTORES, PAGINAS_POR_CONSULTA, args.paginas_por_trabajo,
+                                  procesos=args.trabajadores, duracion_lease=args.lease,
+                                  crear_driver=crear_driver, intervalo_minimo=args.intervalo_minimo,
+                                  ttl_cache=None if args.sin_cache else args.ttl_cache * 3600,
+                                  ttl_memo=None if args.sin_memo else args.ttl_cache * 3600,
+                                  enriquecer=args.enriquecer)
+        # Los leads de todos los nodos se fusionan en el almacén local a través del índice de deduplicación
+        almacen = AlmacenLeads()
+        indice = abrir_indice(RUTA_INDICE, almacen)
+        cola = ColaTrabajos(ruta_cola)
+        print(f"🔀 Fusionados {cola.fusionar(almacen, indice)} leads nuevos de la cola")
+        cola.cerrar()
+        indice.cerrar()
+        print(f"💾 Exportado a '{RUTA_EXCEL}' - Total: {almacen.exportar()} leads únicos")
+        almacen.cerrar()
+    elif args.trabajadores > 1:
+        from pool_navegadores import PoolNavegadores
+
+        PoolNavegadores(trabajadores=args.trabajadores, crear_driver=crear_driver,
+                        intervalo_minimo=args.intervalo_minimo,
+                        usar_cache=not args.sin_cache, ttl_cache=args.ttl_cache * 3600,
+                        usar_memo=not args.sin_memo, punto_control=punto_control, directorio_metricas=args.metricas,
+                        enriquecer=args.enriquecer).ejecutar()
+        almacen = AlmacenLeads()
+        print(f"💾 Exportado a '{RUTA_EXCEL}' - Total: {almacen.exportar()} leads únicos")
+        almacen.cerrar()
+    else:
+        cache = None if args.sin_cache else CacheResultados(ttl=args.ttl_cache * 3600)
+        memo = None if args.sin_memo else MemoResultados(ttl=args.ttl_cache * 3600)
+        extractor = LeadsExtractor(crear_driver=crear_driver, extraccion_masiva=not args.extraccion_elementos,
+                                   ritmo=Ritmo(args.intervalo_minimo), cache=cache,
+                                   punto_control=punto_control, consulta_cprofile=args.cprofile_consulta,
+                                   enriquecedor=crear_enriquecedor(args.enriquecer), memo=memo)
+        if args.pipeline:
+            extractor.iniciar_pipeline(args.pipeline, args.capacidad_cola, args.extraccion_procesos)
+        extractor.ejecutar()
+
+    if args.metricas:
+        metricas.escribir(args.metricas)
+        print(f"📈 Perfil de la ejecución guardado en '{args.metricas}'")
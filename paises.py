@@ -0,0 +1,194 @@
+"""Reglas telefónicas y palabras clave de cada país.
+
+Cada entrada define:
+    prefijo     prefijo internacional
+    longitudes  dígitos válidos del número nacional (sin prefijo ni troncal)
+    troncal     dígito que precede a los números nacionales marcados dentro del país ("" si no hay)
+    inicio      dígitos por los que empieza un número local escrito sin troncal (p. ej. móviles)
+    dominio     dominio de primer nivel del país
+    ciudades    ciudades que identifican al país sin ambigüedad
+    palabras    nombre del país, gentilicios y otras palabras clave
+
+Las palabras clave se buscan como palabras completas en el texto en
+minúsculas; añadir un país solo requiere una entrada nueva en esta tabla.
+"""
+
+PREFIJOS = ["+595", "+598"]  # Prefijos de los países objetivo (Paraguay y Uruguay)
+
+# Nombres que también son calles, ciudades de otros países o palabras comunes
+# ("Avenida España", "oficina roma"): solo cuentan para el país de la consulta
+AMBIGUAS = {"españa", "espana", "brasil", "colombia", "chile", "méxico", "mexico", "lima", "roma", "cali", "cuba"}
+
+PAISES = {
+    "Paraguay": {
+        'prefijo': "+595", 'longitudes': (9,), 'troncal': "0", 'inicio': "9", 'dominio': "py",
+        'ciudades': ["asunción", "asuncion", "ciudad del este"],
+        'palabras': ["paraguay", "py", "paraguayo", "paraguaya", "paraguayos", "paraguayas"],
+    },
+    "Uruguay": {
+        'prefijo': "+598", 'longitudes': (8,), 'troncal': "0", 'inicio': "9", 'dominio': "uy",
+        'ciudades': ["montevideo", "punta del este", "colonia del sacramento"],
+        'palabras': ["uruguay", "uy", "uruguayo", "uruguaya", "uruguayos", "uruguayas"],
+    },
+    "Argentina": {
+        'prefijo': "+54", 'longitudes': (10, 11), 'troncal': "0", 'inicio': "", 'dominio': "ar",
+        'ciudades': ["buenos aires", "mar del plata"],
+        'palabras': ["argentina", "argentino", "argentinos", "argentinas"],
+    },
+    "Brasil": {
+        'prefijo': "+55", 'longitudes': (10, 11), 'troncal': "0", 'inicio': "", 'dominio': "br",
+        'ciudades': ["são paulo", "sao paulo", "rio de janeiro", "brasília", "brasilia", "florianópolis"],
+        'palabras': ["brasil", "brazil", "brasileño", "brasileña", "brasileños", "brasileiro"],
+    },
+    "Chile": {
+        'prefijo': "+56", 'longitudes': (9,), 'troncal': "", 'inicio': "29", 'dominio': "cl",
+        'ciudades': ["santiago de chile", "valparaíso", "valparaiso", "viña del mar", "concepción de chile"],
+        'palabras': ["chile", "chileno", "chilena", "chilenos", "chilenas"],
+    },
+    "Bolivia": {
+        'prefijo': "+591", 'longitudes': (8,), 'troncal': "0", 'inicio': "67", 'dominio': "bo",
+        'ciudades': ["santa cruz de la sierra", "cochabamba"],
+        'palabras': ["bolivia", "boliviano", "boliviana", "bolivianos", "bolivianas"],
+    },
+    "Perú": {
+        'prefijo': "+51", 'longitudes': (8, 9), 'troncal': "0", 'inicio': "9", 'dominio': "pe",
+        'ciudades': ["lima", "arequipa", "cusco"],
+        'palabras': ["perú", "peru", "peruano", "peruana", "peruanos", "peruanas"],
+    },
+    "Ecuador": {
+        'prefijo': "+593", 'longitudes': (8, 9), 'troncal': "0", 'inicio': "", 'dominio': "ec",
+        'ciudades': ["quito", "guayaquil", "cuenca de ecuador"],
+        'palabras': ["ecuador", "ecuatoriano", "ecuatoriana", "ecuatorianos", "ecuatorianas"],
+    },
+    "Colombia": {
+        'prefijo': "+57", 'longitudes': (10,), 'troncal': "", 'inicio': "3", 'dominio': "co",
+        'ciudades': ["bogotá", "bogota", "medellín", "medellin", "cali", "barranquilla", "cartagena de indias"],
+        'palabras': ["colombia", "colombiano", "colombiana", "colombianos", "colombianas"],
+    },
+    "Venezuela": {
+        'prefijo': "+58", 'longitudes': (10,), 'troncal': "0", 'inicio': "", 'dominio': "ve",
+        'ciudades': ["caracas", "maracaibo", "barquisimeto"],
+        'palabras': ["venezuela", "venezolano", "venezolana", "venezolanos", "venezolanas"],
+    },
+    "México": {
+        'prefijo': "+52", 'longitudes': (10,), 'troncal': "", 'inicio': "", 'dominio': "mx",
+        'ciudades': ["ciudad de méxico", "cdmx", "guadalajara", "monterrey", "cancún", "cancun"],
+        'palabras': ["méxico", "mexico", "mexicano", "mexicana", "mexicanos", "mexicanas"],
+    },
+    "Panamá": {
+        'prefijo': "+507", 'longitudes': (7, 8), 'troncal': "", 'inicio': "6", 'dominio': "pa",
+        'ciudades': ["ciudad de panamá", "colón de panamá"],
+        'palabras': ["panamá", "panama", "panameño", "panameña", "panameños", "panameñas"],
+    },
+    "Costa Rica": {
+        'prefijo': "+506", 'longitudes': (8,), 'troncal': "", 'inicio': "678", 'dominio': "cr",
+        'ciudades': ["san josé de costa rica", "escazú", "escazu"],
+        'palabras': ["costa rica", "costarricense", "costarricenses"],
+    },
+    "Guatemala": {
+        'prefijo': "+502", 'longitudes': (8,), 'troncal': "", 'inicio': "", 'dominio': "gt",
+        'ciudades': ["ciudad de guatemala", "quetzaltenango", "antigua guatemala"],
+        'palabras': ["guatemala", "guatemalteco", "guatemalteca", "guatemaltecos", "guatemaltecas"],
+    },
+    "Honduras": {
+        'prefijo': "+504", 'longitudes': (8,), 'troncal': "", 'inicio': "", 'dominio': "hn",
+        'ciudades': ["tegucigalpa", "san pedro sula"],
+        'palabras': ["honduras", "hondureño", "hondureña", "hondureños", "hondureñas"],
+    },
+    "El Salvador": {
+        'prefijo': "+503", 'longitudes': (8,), 'troncal': "", 'inicio': "", 'dominio': "sv",
+        'ciudades': ["san salvador", "santa ana de el salvador"],
+        'palabras': ["el salvador", "salvadoreño", "salvadoreña", "salvadoreños", "salvadoreñas"],
+    },
+    "Nicaragua": {
+        'prefijo': "+505", 'longitudes': (8,), 'troncal': "", 'inicio': "", 'dominio': "ni",
+        'ciudades': ["managua"],
+        'palabras': ["nicaragua", "nicaragüense", "nicaraguense", "nicaragüenses"],
+    },
+    "Cuba": {
+        'prefijo': "+53", 'longitudes': (8,), 'troncal': "0", 'inicio': "5", 'dominio': "cu",
+        'ciudades': ["la habana", "santiago de cuba"],
+        'palabras': ["cuba", "cubano", "cubana", "cubanos", "cubanas"],
+    },
+    "España": {
+        'prefijo': "+34", 'longitudes': (9,), 'troncal': "", 'inicio': "6789", 'dominio': "es",
+        'ciudades': ["madrid", "barcelona", "sevilla", "málaga", "malaga", "bilbao", "marbella"],
+        'palabras': ["españa", "espana", "spain", "español", "española", "españoles", "españolas"],
+    },
+    "Portugal": {
+        'prefijo': "+351", 'longitudes': (9,), 'troncal': "", 'inicio': "29", 'dominio': "pt",
+        'ciudades': ["lisboa", "lisbon", "oporto"],
+        'palabras': ["portugal", "portugués", "portuguesa", "portugueses", "portuguesas"],
+    },
+    "Italia": {
+        'prefijo': "+39", 'longitudes': (9, 10), 'troncal': "", 'inicio': "03", 'dominio': "it",
+        'ciudades': ["roma", "milán", "milan", "nápoles", "turín", "florencia"],
+        'palabras': ["italia", "italy", "italiano", "italiana", "italianos", "italianas"],
+    },
+    "Francia": {
+        'prefijo': "+33", 'longitudes': (9,), 'troncal': "0", 'inicio': "", 'dominio': "fr",
+        'ciudades': ["parís", "paris", "lyon", "marsella", "niza"],
+        'palabras': ["francia", "france", "francés", "francesa", "franceses", "francesas"],
+    },
+    "Alemania": {
+        'prefijo': "+49", 'longitudes': (10, 11), 'troncal': "0", 'inicio': "", 'dominio': "de",
+        'ciudades': ["berlín", "berlin", "múnich", "munich", "fráncfort", "frankfurt", "hamburgo"],
+        'palabras': ["alemania", "germany", "alemán", "alemana", "alemanes", "alemanas"],
+    },
+    "Reino Unido": {
+        'prefijo': "+44", 'longitudes': (10,), 'troncal': "0", 'inicio': "", 'dominio': "uk",
+        'ciudades': ["londres", "london", "manchester", "edimburgo"],
+        'palabras': ["reino unido", "united kingdom", "inglaterra", "británico", "británica", "britanicos"],
+    },
+    "Estados Unidos": {
+        'prefijo': "+1", 'longitudes': (10,), 'troncal': "", 'inicio': "", 'dominio': "us",
+        'ciudades': ["nueva york", "new york", "miami", "los ángeles", "los angeles", "houston"],
+        'palabras': ["estados unidos", "eeuu", "ee.uu", "estadounidense", "estadounidenses"],
+    },
+    "Suiza": {
+        'prefijo': "+41", 'longitudes': (9,), 'troncal': "0", 'inicio': "", 'dominio': "ch",
+        'ciudades': ["zúrich", "zurich", "ginebra", "geneva", "lugano", "berna"],
+        'palabras': ["suiza", "switzerland", "suizo", "suizos", "suizas"],
+    },
+    "Andorra": {
+        'prefijo': "+376", 'longitudes': (6,), 'troncal': "", 'inicio': "", 'dominio': "ad",
+        'ciudades': ["andorra la vella", "escaldes-engordany"],
+        'palabras': ["andorra", "andorrano", "andorrana", "andorranos", "andorranas"],
+    },
+    "Países Bajos": {
+        'prefijo': "+31", 'longitudes': (9,), 'troncal': "0", 'inicio': "", 'dominio': "nl",
+        'ciudades': ["ámsterdam", "amsterdam", "róterdam", "rotterdam", "la haya"],
+        'palabras': ["países bajos", "paises bajos", "holanda", "netherlands", "neerlandés", "holandés"],
+    },
+    "Bélgica": {
+        'prefijo': "+32", 'longitudes': (8, 9), 'troncal': "0", 'inicio': "", 'dominio': "be",
+        'ciudades': ["bruselas", "brussels", "amberes", "antwerp"],
+        'palabras': ["bélgica", "belgica", "belgium", "belga", "belgas"],
+    },
+    "Irlanda": {
+        'prefijo': "+353", 'longitudes': (9,), 'troncal': "0", 'inicio': "", 'dominio': "ie",
+        'ciudades': ["dublín", "dublin"],
+        'palabras': ["irlanda", "ireland", "irlandés", "irlandesa", "irlandeses"],
+    },
+    "Luxemburgo": {
+        'prefijo': "+352", 'longitudes': (8, 9), 'troncal': "", 'inicio': "", 'dominio': "lu",
+        'ciudades': [],
+        'palabras': ["luxemburgo", "luxembourg", "luxemburgués", "luxemburguesa"],
+    },
+    "Emiratos Árabes Unidos": {
+        'prefijo': "+971", 'longitudes': (9,), 'troncal': "0", 'inicio': "", 'dominio': "ae",
+        'ciudades': ["dubái", "dubai", "abu dabi", "abu dhabi"],
+        'palabras': ["emiratos árabes", "emiratos arabes", "emiratí", "emiratos"],
+    },
+    "Israel": {
+        'prefijo': "+972", 'longitudes': (9,), 'troncal': "0", 'inicio': "", 'dominio': "il",
+        'ciudades': ["tel aviv", "jerusalén", "jerusalem", "haifa"],
+        'palabras': ["israel", "israelí", "israeli", "israelíes"],
+    },
+}
+
+
+def paises_por_prefijo(prefijos):
+    """Nombres de los países de la tabla con esos prefijos internacionales, en el mismo orden"""
+    por_prefijo = {reglas['prefijo']: pais for pais, reglas in PAISES.items()}
+    return [por_prefijo[prefijo] for prefijo in prefijos if prefijo in por_prefijo]
@@ -0,0 +1,190 @@
+"""Pipeline productor/consumidor que separa la navegación de la extracción y el guardado.
+
+    navegador --(cola de resultados)--> extracción (N hilos o procesos) --(cola de leads)--> sumidero
+
+Las colas tienen capacidad limitada: si la extracción o el guardado se
+retrasan, el navegador se bloquea al encolar en lugar de acumular memoria.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from extraccion import motor_para_consulta
+from instrumentacion import metricas
+
+TRABAJADORES_EXTRACCION = 2
+CAPACIDAD_COLA = 200
+TAMANO_LOTE = 50
+ESPERA_LOTE = 0.5
+
+_FIN = object()
+
+
+def extraer_registro(texto, consulta):
+    """Extracción de contactos de un resultado (función de módulo para poder usarla en procesos)"""
+    return motor_para_consulta(consulta).extraer(texto)
+
+
+class _Etapa:
+    """Contadores de una etapa: elementos procesados y tiempo ocupado"""
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.procesados = 0
+        self.ocupado = 0.0
+        self.bloqueo = threading.Lock()
+
+    def registrar(self, cantidad, segundos):
+        with self.bloqueo:
+            self.procesados += cantidad
+            self.ocupado += segundos
+        metricas.observar(f"pipeline: {self.nombre}", segundos)
+
+
+class Pipeline:
+    def __init__(self, extractor, trabajadores=TRABAJADORES_EXTRACCION, capacidad=CAPACIDAD_COLA,
+                 tamano_lote=TAMANO_LOTE, usar_procesos=False):
+        self.extractor = extractor
+        self.trabajadores = trabajadores
+        self.capacidad = capacidad
+        self.tamano_lote = tamano_lote
+        self.cola_resultados = queue.Queue(maxsize=capacidad)
+        self.cola_leads = queue.Queue(maxsize=capacidad)
+        self.profundidad_maxima = {'resultados': 0, 'leads': 0}
+        self.etapas = {nombre: _Etapa(nombre) for nombre in ("navegador", "extraccion", "sumidero")}
+        self.inicio = time.perf_counter()
+        self.procesos = ProcessPoolExecutor(trabajadores) if usar_procesos else None
+
+        self.hilos_extraccion = [
+            threading.Thread(target=self._extraer, name=f"extraccion-{i}", daemon=True)
+            for i in range(trabajadores)
+        ]
+        self.hilo_sumidero = threading.Thread(target=self._sumidero, name="sumidero", daemon=True)
+        for hilo in self.hilos_extraccion + [self.hilo_sumidero]:
+            hilo.start()
+
+    def producir(self, titulo, enlace, texto, consulta):
+        """Encola un resultado crudo; bloquea si la cola está llena (contrapresión)"""
+        inicio = time.perf_counter()
+        self.cola_resultados.put((titulo, enlace, texto, consulta))
+        self.etapas['navegador'].registrar(1, time.perf_counter() - inicio)
+        self._anotar_profundidad('resultados', self.cola_resultados)
+
+    def entregar(self, titulo, enlace, consulta, info):
+        """Encola contactos ya extraídos (p. ej. del enriquecedor) directamente en el sumidero"""
+        self.cola_leads.put((titulo, enlace, consulta, info))
+        self._anotar_profundidad('leads', self.cola_leads)
+
+    def _anotar_profundidad(self, nombre, cola):
+        profundidad = cola.qsize()
+        if profundidad > self.profundidad_maxima[nombre]:
+            self.profundidad_maxima[nombre] = profundidad
+
+    def _extraer(self):
+        while True:
+            registro = self.cola_resultados.get()
+            if registro is _FIN:
+                self.cola_resultados.task_done()
+                return
+            titulo, enlace, texto, consulta = registro
+            inicio = time.perf_counter()
+            info = None
+            try:
+                if texto:
+                    if self.procesos is not None:
+                        info = self.procesos.submit(extraer_registro, texto, consulta).result()
+                    else:
+                        info = extraer_registro(texto, consulta)
+                    if self.extractor.memo is not None:
+                        self.extractor.memo.guardar(enlace, texto, consulta, info)
+                    if not info['telefonos'] and not info['email']:
+                        if self.extractor.enriquecedor is not None:
+                            self.extractor.enriquecedor.enviar(titulo, enlace, consulta)
+                        info = None
+            except Exception as e:
+                print(f"⚠️ Error al extraer contactos de '{titulo[:60]}': {str(e)}")
+                info = None
+            self.etapas['extraccion'].registrar(1, time.perf_counter() - inicio)
+            if info is not None:
+                self.entregar(titulo, enlace, consulta, info)
+            self.cola_resultados.task_done()
+
+    def _sumidero(self):
+        """Única etapa que escribe: deduplica, crea los leads y los guarda por lotes"""
+        terminar = False
+        while not terminar:
+            lote = [self.cola_leads.get()]
+            limite = time.monotonic() + ESPERA_LOTE
+            while len(lote) < self.tamano_lote and lote[-1] is not _FIN:
+                try:
+                    lote.append(self.cola_leads.get(timeout=max(0.0, limite - time.monotonic())))
+                except queue.Empty:
+                    break
+            if lote[-1] is _FIN:
+                terminar = True
+                lote.pop()
+
+            inicio = time.perf_counter()
+            nuevos = []
+            for titulo, enlace, consulta, info in lote:
+                try:
+                    nuevos.extend(self.extractor.construir_leads(titulo, enlace, consulta, info))
+                except Exception as e:
+                    print(f"⚠️ Error al procesar resultado: {str(e)}")
+            if nuevos:
+                self.extractor.guardar_lote(nuevos)
+            self.etapas['sumidero'].registrar(len(lote), time.perf_counter() - inicio)
+            for _ in range(len(lote) + terminar):
+                self.cola_leads.task_done()
+
+    def esperar(self):
+        """Bloquea hasta que todo lo encolado se haya extraído y guardado"""
+        self.cola_resultados.join()
+        self.cola_leads.join()
+
+    def estadisticas(self):
+        duracion = time.perf_counter() - self.inicio
+        return {
+            'colas': {
+                'resultados': {'actual': self.cola_resultados.qsize(), 'maxima': self.profundidad_maxima['resultados'],
+                               'capacidad': self.capacidad},
+                'leads': {'actual': self.cola_leads.qsize(), 'maxima': self.profundidad_maxima['leads'],
+                          'capacidad': self.capacidad},
+            },
+            'etapas': {
+                nombre: {
+                    'procesados': etapa.procesados,
+                    'por_segundo': etapa.procesados / duracion if duracion else 0.0,
+                    # Fracción del tiempo que la etapa ha estado trabajando (o bloqueada, en el navegador)
+                    'ocupacion': etapa.ocupado / duracion / (self.trabajadores if nombre == "extraccion" else 1)
+                    if duracion else 0.0,
+                }
+                for nombre, etapa in self.etapas.items()
+            },
+        }
+
+    def resumen_colas(self):
+        colas = self.estadisticas()['colas']
+        return ", ".join(
+            f"{nombre} {datos['actual']}/{datos['capacidad']} (máx. {datos['maxima']})"
+            for nombre, datos in colas.items()
+        )
+
+    def resumen(self):
+        lineas = [f"Colas: {self.resumen_colas()}"]
+        for nombre, datos in self.estadisticas()['etapas'].items():
+            lineas.append(f"{nombre}: {datos['procesados']} elementos, {datos['por_segundo']:.1f}/s, "
+                          f"ocupación {datos['ocupacion'] * 100:.0f}%")
+        return lineas
+
+    def cerrar(self):
+        """Vacía el pipeline y detiene los hilos"""
+        for _ in self.hilos_extraccion:
+            self.cola_resultados.put(_FIN)
+        for hilo in self.hilos_extraccion:
+            hilo.join()
+        self.cola_leads.put(_FIN)
+        self.hilo_sumidero.join()
+        if self.procesos is not None:
+            self.procesos.shutdown()
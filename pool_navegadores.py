@@ -0,0 +1,261 @@
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+
+from almacen import AlmacenLeads, RUTA_ALMACEN
+from cache import CacheResultados, MemoResultados, TTL_CACHE
+from instrumentacion import metricas
+from dedup import RUTA_INDICE
+from main import LeadsExtractor, SECTORES, abrir_indice, crear_driver_chrome, crear_enriquecedor
+from ritmo import Ritmo, INTERVALO_MINIMO
+
+
+def _terminar(signum, frame):
+    # Convertir SIGTERM en SystemExit para que se ejecuten los finally y se cierre el navegador
+    sys.exit(0)
+
+
+def trabajador(numero, cola_consultas, cola_resultados, en_curso, crear_driver, max_reinicios, intervalo_minimo,
+               ttl_cache, directorio_metricas, enriquecer, ttl_memo=None):
+    """Proceso trabajador: un Chrome aislado que toma consultas de la cola compartida.
+
+    La consulta en curso se anota en en_curso[numero], memoria compartida que se
+    escribe al momento: un mensaje por la cola podría perderse si el proceso muere
+    antes de que su hilo alimentador lo envíe.
+    """
+    signal.signal(signal.SIGTERM, _terminar)
+    if directorio_metricas:
+        metricas.activar()
+    extractor = None
+    cache = CacheResultados(ttl=ttl_cache) if ttl_cache else None
+    memo = MemoResultados(ttl=ttl_memo) if ttl_memo else None
+    try:
+        while True:
+            tarea = cola_consultas.get()
+            if tarea is None:
+                en_curso[numero] = -1
+                break
+            indice, sector = tarea
+            en_curso[numero] = indice
+
+            datos = []
+            completada = False
+            reinicios = 0
+            while True:
+                try:
+                    if extractor is None:
+                        extractor = LeadsExtractor(ruta_almacen=None, ruta_indice=None, crear_driver=crear_driver,
+                                                   ritmo=Ritmo(intervalo_minimo), cache=cache,
+                                                   enriquecedor=crear_enriquecedor(enriquecer), memo=memo)
+                    elif not extractor.sesion_activa():
+                        print(f"🔄 Trabajador {numero}: reiniciando el navegador")
+                        extractor.reiniciar_driver()
+
+                    extractor.data = []
+                    with metricas.medir("consulta"):
+                        completada = extractor.buscar_numeros(sector)
+                    extractor.procesar_enriquecidos(esperar=True)
+
+                    # buscar_numeros captura sus propios errores: si el navegador ha caído
+                    # durante la búsqueda, los resultados parciales se descartan y se repite
+                    if not extractor.sesion_activa():
+                        raise RuntimeError("la sesión del navegador dejó de responder")
+                    # Con páginas fallidas (CAPTCHA, timeout) se repite con otra sesión; agotados
+                    # los reinicios se entregan los leads parciales sin dar la consulta por completada
+                    datos = extractor.data
+                    if completada or reinicios >= max_reinicios:
+                        break
+                    raise RuntimeError("alguna página de la consulta falló")
+                except Exception as e:
+                    reinicios += 1
+                    print(f"❌ Trabajador {numero}: error en '{sector}': {str(e)}")
+                    if reinicios > max_reinicios:
+                        print(f"⚠️ Trabajador {numero}: se abandona '{sector}' tras {max_reinicios} reinicios")
+                        break
+                    if extractor is not None:
+                        extractor.reiniciar_driver()
+
+            cola_resultados.put(("resultado", numero, (indice, sector, datos, completada)))
+    finally:
+        if extractor is not None:
+            try:
+                extractor.driver.quit()
+            except Exception:
+                pass
+            if extractor.enriquecedor is not None:
+                extractor.enriquecedor.cerrar()
+        if directorio_metricas:
+            metricas.escribir(os.path.join(directorio_metricas, f"trabajador-{numero}"))
+        if memo is not None:
+            cola_resultados.put(("memo", numero, (memo.aciertos, memo.fallos, memo.sectores_adicionales)))
+            memo.cerrar()
+        if cache is not None:
+            cola_resultados.put(("cache", numero, (cache.aciertos, cache.fallos)))
+            cache.cerrar()
+
+
+class PoolNavegadores:
+    """Ejecuta las consultas en N procesos con un Chrome aislado cada uno.
+
+    Los resultados se reordenan por consulta antes de deduplicarlos y
+    guardarlos, de modo que el almacén queda igual que en una ejecución serie.
+    """
+
+    def __init__(self, trabajadores=2, ruta_almacen=RUTA_ALMACEN, crear_driver=crear_driver_chrome,
+                 max_reinicios=2, intervalo_minimo=INTERVALO_MINIMO, usar_cache=True, ttl_cache=TTL_CACHE,
+                 usar_memo=True, punto_control=None, directorio_metricas=None, ruta_indice=RUTA_INDICE, enriquecer=False):
+        self.num_trabajadores = trabajadores
+        self.ruta_almacen = ruta_almacen
+        self.crear_driver = crear_driver
+        self.max_reinicios = max_reinicios
+        self.intervalo_minimo = intervalo_minimo
+        self.ttl_cache = ttl_cache if usar_cache else None
+        self.ttl_memo = ttl_cache if usar_memo else None
+        self.memo = [0, 0, 0]   # aciertos, fallos y términos adicionales que informan los trabajadores
+        self.punto_control = punto_control
+        self.directorio_metricas = directorio_metricas
+        self.ruta_indice = ruta_indice
+        self.enriquecer = enriquecer
+        self.procesos = {}
+
+    def _lanzar(self, numero):
+        proceso = multiprocessing.Process(
+            target=trabajador,
+            args=(numero, self.cola_consultas, self.cola_resultados, self.en_curso, self.crear_driver,
+                  self.max_reinicios, self.intervalo_minimo, self.ttl_cache, self.directorio_metricas,
+                  self.enriquecer, self.ttl_memo),
+            daemon=True
+        )
+        proceso.start()
+        self.procesos[numero] = proceso
+
+    def ejecutar(self, sectores=SECTORES):
+        """Procesa todas las consultas, guarda los leads únicos en orden serie y devuelve cuántos son"""
+        self.cola_consultas = multiprocessing.Queue()
+        self.cola_resultados = multiprocessing.Queue()
+        # Consulta que procesa cada trabajador (-1 si ninguna), para reencolarla si muere
+        self.en_curso = multiprocessing.Array("i", [-1] * self.num_trabajadores, lock=False)
+        # Los sectores completados en una ejecución anterior no se vuelven a lanzar
+        self.sectores = [
+            sector for sector in sectores
+            if not (self.punto_control and self.punto_control.sector_completado(sector))
+        ]
+        for tarea in enumerate(self.sectores):
+            self.cola_consultas.put(tarea)
+
+        almacen = AlmacenLeads(self.ruta_almacen) if self.ruta_almacen else None
+        indice_dedup = abrir_indice(self.ruta_indice, almacen) if self.ruta_indice else None
+        pendientes = {}      # indice -> leads recibidos fuera de orden
+        siguiente = 0
+        incompletos = []
+        total_leads = 0
+
+        print(f"🚀 Iniciando pool con {self.num_trabajadores} navegadores")
+        try:
+            for numero in range(self.num_trabajadores):
+                self._lanzar(numero)
+
+            while siguiente < len(self.sectores):
+                try:
+                    tipo, numero, contenido = self.cola_resultados.get(timeout=1)
+                except queue.Empty:
+                    self._vigilar(siguiente, pendientes)
+                    continue
+
+                if tipo in ("cache", "memo"):
+                    continue
+
+                indice, sector, datos, completada = contenido
+                # Una consulta reencolada tras morir su trabajador puede llegar dos veces
+                if indice < siguiente or indice in pendientes:
+                    continue
+                pendientes[indice] = (sector, datos, completada)
+                print(f"📥 Resultados de '{sector}': {len(datos)} leads")
+
+                # Guardar en el orden de las consultas para reproducir la ejecución serie
+                while siguiente in pendientes:
+                    sector, datos, completada = pendientes.pop(siguiente)
+                    nuevos = [
+                        lead for lead in datos
+                        if indice_dedup is None or indice_dedup.agregar(lead[2], lead[3], lead[1])
+                    ]
+                    # Las claves llegan al índice en disco solo después de guardar los leads
+                    if almacen is not None:
+                        almacen.agregar_lote(nuevos)
+                    if indice_dedup is not None:
+                        indice_dedup.confirmar()
+                    total_leads += len(nuevos)
+                    if not completada:
+                        incompletos.append(sector)
+                    elif self.punto_control:
+                        self.punto_control.marcar_sector(sector)
+                    siguiente += 1
+
+            if incompletos:
+                # El punto de control se conserva para repetir solo esos términos
+                print(f"⚠️ Términos con páginas pendientes: {', '.join(incompletos)}")
+            elif self.punto_control:
+                self.punto_control.borrar()
+        finally:
+            aciertos, fallos = self.cerrar()
+            if almacen is not None:
+                almacen.cerrar()
+            if indice_dedup is not None:
+                indice_dedup.cerrar()
+
+        print(f"✅ Pool finalizado: {total_leads} leads únicos")
+        if self.ttl_cache:
+            print(f"♻️ Caché de resultados: {aciertos} aciertos, {fallos} fallos")
+        if self.ttl_memo:
+            aciertos, fallos, adicionales = self.memo
+            tasa = aciertos / (aciertos + fallos) * 100 if aciertos + fallos else 0
+            print(f"🧠 Memo de resultados: {aciertos} aciertos, {fallos} fallos ({tasa:.0f}% de acierto), "
+                  f"{adicionales} términos adicionales anotados")
+        return total_leads
+
+    def _vigilar(self, siguiente, pendientes):
+        """Relanza los trabajadores que hayan muerto y reencola la consulta que tenían si no llegó"""
+        for numero, proceso in list(self.procesos.items()):
+            if proceso.is_alive() or proceso.exitcode == 0:
+                continue
+            print(f"⚠️ Trabajador {numero} terminó inesperadamente (código {proceso.exitcode}), relanzando")
+            indice = self.en_curso[numero]
+            self.en_curso[numero] = -1
+            if indice >= siguiente and indice not in pendientes:
+                self.cola_consultas.put((indice, self.sectores[indice]))
+            self._lanzar(numero)
+
+    def cerrar(self):
+        """Detiene todos los trabajadores, que cierran su navegador al salir.
+
+        Devuelve los aciertos y fallos de caché que informan los trabajadores al terminar.
+        """
+        for _ in self.procesos:
+            self.cola_consultas.put(None)
+        aciertos = fallos = 0
+        pendientes = set(self.procesos)
+        limite = time.monotonic() + 30
+        while pendientes and time.monotonic() < limite:
+            try:
+                tipo, numero, contenido = self.cola_resultados.get(timeout=1)
+            except queue.Empty:
+                pendientes = {numero for numero in pendientes if self.procesos[numero].is_alive()}
+                continue
+            if tipo == "memo":
+                self.memo = [total + parcial for total, parcial in zip(self.memo, contenido)]
+                if self.ttl_cache is None:
+                    pendientes.discard(numero)
+            if tipo == "cache":
+                aciertos += contenido[0]
+                fallos += contenido[1]
+                pendientes.discard(numero)
+        for proceso in self.procesos.values():
+            proceso.join(timeout=30)
+            if proceso.is_alive():
+                proceso.terminate()
+                proceso.join()
+        self.procesos = {}
+        return aciertos, fallos
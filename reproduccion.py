@@ -0,0 +1,198 @@
+"""Modo de reproducción sin navegador: procesa páginas de resultados guardadas en HTML."""
+import os
+import re
+import time
+from html.parser import HTMLParser
+
+from instrumentacion import metricas
+from main import SELECTOR_RESULTADOS, SELECTORES_TEXTO
+
+ELEMENTOS_VACIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+                    "meta", "source", "track", "wbr"}
+ELEMENTOS_BLOQUE = {"address", "article", "aside", "blockquote", "div", "dl", "dt", "dd", "footer",
+                    "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "li", "main", "nav", "ol",
+                    "p", "section", "table", "tr", "ul"}
+ELEMENTOS_OCULTOS = {"script", "style", "noscript", "template"}
+PATRON_ESPACIOS = re.compile(r'\s+')
+
+
+def _parsear_selector(selector):
+    etiqueta, _, clase = selector.strip().partition(".")
+    return etiqueta, clase or None
+
+
+SELECTORES_RESULTADO = [_parsear_selector(selector) for selector in SELECTOR_RESULTADOS.split(",")]
+SELECTORES_BLOQUES = [_parsear_selector(selector) for selector in SELECTORES_TEXTO]
+
+
+def _coincide(selector, etiqueta, clases):
+    etiqueta_selector, clase = selector
+    return etiqueta_selector == etiqueta and (clase is None or clase in clases)
+
+
+def _texto_visible(partes):
+    """Aproxima innerText: espacios colapsados y una línea por bloque"""
+    lineas = (" ".join(linea.split()) for linea in "".join(partes).split("\n"))
+    return "\n".join(linea for linea in lineas if linea)
+
+
+class ParserResultados(HTMLParser):
+    """Extrae de una página de resultados lo mismo que SCRIPT_EXTRAER_RESULTADOS en el navegador"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pila = []          # (etiqueta, acumulador, resultado, oculto)
+        self.acumuladores = []  # acumuladores de texto de los elementos abiertos que interesan
+        self.abiertos = []      # resultados cuyo contenedor sigue abierto
+        self.registros = []
+        self.ocultos = 0
+        self.consulta = None
+        self._consulta_textarea = None
+
+    def handle_starttag(self, etiqueta, atributos):
+        atributos = dict(atributos)
+        if etiqueta == "input" and atributos.get("name") == "q" and self.consulta is None:
+            self.consulta = atributos.get("value")
+        if etiqueta in ELEMENTOS_VACIOS:
+            if etiqueta == "br":
+                self._agregar_texto("\n")
+            return
+
+        estilo = (atributos.get("style") or "").replace(" ", "")
+        oculto = (etiqueta in ELEMENTOS_OCULTOS or "hidden" in atributos or "display:none" in estilo)
+        if oculto:
+            self.ocultos += 1
+        if etiqueta in ELEMENTOS_BLOQUE:
+            self._agregar_texto("\n")
+
+        clases = set((atributos.get("class") or "").split())
+        acumulador = None
+        resultado = None
+        if not self.ocultos:
+            if etiqueta == "textarea" and atributos.get("name") == "q" and self.consulta is None:
+                self._consulta_textarea = []
+            if any(_coincide(selector, etiqueta, clases) for selector in SELECTORES_RESULTADO):
+                resultado = {'titulo': None, 'enlace': None, 'bloques': []}
+                self.registros.append(resultado)
+
+            for registro in self.abiertos:
+                if etiqueta == "h3" and registro['titulo'] is None:
+                    acumulador = acumulador if acumulador is not None else []
+                    registro['titulo'] = acumulador
+                if etiqueta == "a" and registro['enlace'] is None:
+                    registro['enlace'] = atributos.get("href") or ""
+                for orden, selector in enumerate(SELECTORES_BLOQUES):
+                    if _coincide(selector, etiqueta, clases):
+                        acumulador = acumulador if acumulador is not None else []
+                        registro['bloques'].append((orden, acumulador))
+
+            if resultado is not None:
+                self.abiertos.append(resultado)
+        if acumulador is not None:
+            self.acumuladores.append(acumulador)
+        self.pila.append((etiqueta, acumulador, resultado, oculto))
+
+    def handle_endtag(self, etiqueta):
+        if not any(abierta[0] == etiqueta for abierta in self.pila):
+            return
+        # Cerrar también los elementos sin etiqueta de cierre que quedaron dentro
+        while self.pila:
+            abierta, acumulador, resultado, oculto = self.pila.pop()
+            if acumulador is not None:
+                self.acumuladores.remove(acumulador)
+            if resultado is not None:
+                self.abiertos.remove(resultado)
+            if oculto:
+                self.ocultos -= 1
+            if abierta == "textarea" and self._consulta_textarea is not None:
+                self.consulta = "".join(self._consulta_textarea)
+                self._consulta_textarea = None
+            if abierta in ELEMENTOS_BLOQUE:
+                self._agregar_texto("\n")
+            if abierta == etiqueta:
+                break
+
+    def handle_data(self, datos):
+        if self._consulta_textarea is not None:
+            self._consulta_textarea.append(datos)
+        if not self.ocultos:
+            self._agregar_texto(PATRON_ESPACIOS.sub(" ", datos))
+
+    def _agregar_texto(self, texto):
+        for acumulador in self.acumuladores:
+            acumulador.append(texto)
+
+    def resultados(self):
+        """Resultados con el mismo formato que LeadsExtractor.extraer_resultados_pagina"""
+        salida = []
+        for registro in self.registros:
+            texto_completo = ""
+            for _, partes in sorted(registro['bloques'], key=lambda bloque: bloque[0]):
+                texto = _texto_visible(partes)
+                if texto:
+                    texto_completo += " " + texto
+            titulo = registro['titulo']
+            salida.append({
+                'titulo': _texto_visible(titulo) if titulo is not None else "Sin título",
+                'enlace': registro['enlace'] or "",
+                'texto': texto_completo
+            })
+        return salida
+
+
+def parsear_pagina(html):
+    """Devuelve (consulta, resultados) de una página de resultados de Google guardada"""
+    parser = ParserResultados()
+    parser.feed(html)
+    parser.close()
+    consulta = parser.consulta
+    if consulta:
+        # Quitar el sufijo que buscar_numeros añade a cada término de búsqueda
+        consulta = consulta.split(" AND (")[0]
+    return consulta, parser.resultados()
+
+
+def listar_paginas(rutas):
+    """Expande directorios a los ficheros .html que contienen, en orden"""
+    paginas = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            paginas.extend(
+                os.path.join(ruta, nombre) for nombre in sorted(os.listdir(ruta))
+                if nombre.endswith((".html", ".htm"))
+            )
+        else:
+            paginas.append(ruta)
+    return paginas
+
+
+def reproducir_paginas(extractor, rutas, consulta=None):
+    """Ejecuta la extracción y el guardado de leads sobre páginas guardadas, sin navegador.
+
+    Si no se indica consulta se usa la del cuadro de búsqueda de cada página.
+    Devuelve un diccionario con el número de páginas, resultados y leads procesados.
+    """
+    estadisticas = {'paginas': 0, 'resultados': 0, 'leads': 0}
+    leads_previos = extractor.leads_encontrados
+    for ruta in listar_paginas(rutas):
+        with open(ruta, encoding="utf-8", errors="replace") as fichero:
+            html = fichero.read()
+
+        inicio_pagina = time.perf_counter()
+        with metricas.medir("parseo_html"):
+            consulta_pagina, resultados = parsear_pagina(html)
+        consulta_pagina = consulta or consulta_pagina or ""
+        extractor.procesar_resultados(resultados, consulta_pagina)
+        duracion_pagina = time.perf_counter() - inicio_pagina
+        extractor.tiempos_pagina.append(duracion_pagina)
+        metricas.observar("procesamiento_pagina", duracion_pagina)
+        metricas.contar("paginas")
+        metricas.contar("resultados", len(resultados))
+
+        estadisticas['paginas'] += 1
+        estadisticas['resultados'] += len(resultados)
+
+    if extractor.pipeline is not None:
+        extractor.pipeline.esperar()
+    estadisticas['leads'] = extractor.leads_encontrados - leads_previos
+    return estadisticas
@@ -0,0 +1,164 @@
+"""Revalidación sin navegador de leads ya exportados con las reglas actuales.
+
+Lee un Excel o CSV con las columnas de COLUMNAS por tandas, vuelve a
+normalizar y validar los teléfonos con la misma lógica que normalizar_numero y
+es_numero_valido pero con operaciones de cadenas de pandas sobre columnas
+enteras, y escribe el resultado deduplicado a través de un AlmacenLeads
+temporal, con la misma exportación por tandas que el resto del extractor.
+"""
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    # Con pyarrow las operaciones .str se ejecutan en kernels nativos; sin él, pandas las recorre en Python
+    TIPO_TEXTO = "string[pyarrow]"
+except ImportError:
+    TIPO_TEXTO = "string"
+
+from almacen import AlmacenLeads, COLUMNAS
+from extraccion import PATRON_SEPARADORES, es_numero_valido, normalizar_numero, pais_de_consulta
+from paises import PAISES
+
+FILAS_POR_TANDA = 100000
+
+# Si dos países compartieran prefijo, manda el primero, igual que en _troncal y es_numero_valido
+PREFIJO_DE_PAIS = {pais: reglas['prefijo'] for pais, reglas in PAISES.items()}
+TRONCALES = {}
+LONGITUDES = {}
+for _reglas in PAISES.values():
+    TRONCALES.setdefault(_reglas['prefijo'], _reglas['troncal'])
+    LONGITUDES.setdefault(_reglas['prefijo'], _reglas['longitudes'])
+
+# Prefijos de mayor a menor longitud para que +598 no se confunda con un +59 hipotético
+PREFIJOS_INTERNACIONALES = sorted(TRONCALES, key=len, reverse=True)
+
+
+def prefijo_de_pais(pais, sector):
+    """Prefijo del país del lead o, si no es uno de PAISES, del país del término de búsqueda"""
+    return PREFIJO_DE_PAIS.get(pais) or PREFIJO_DE_PAIS[pais_de_consulta(sector)]
+
+
+def revalidar_telefono(numero, pais, sector):
+    """Referencia fila a fila: número corregido, '' si no hay número o None si no es válido.
+
+    Un número con prefijo internacional conocido se valida con las reglas de ese
+    país; el resto, con las del país del lead.
+    """
+    numero = PATRON_SEPARADORES.sub('', numero)
+    if not numero:
+        return ''
+    prefijo = next((prefijo for prefijo in PREFIJOS_INTERNACIONALES if numero.startswith(prefijo)), None)
+    prefijo = prefijo or prefijo_de_pais(pais, sector)
+    normalizado = normalizar_numero(numero, prefijo)
+    return normalizado if es_numero_valido(normalizado, prefijo) else None
+
+
+def _revalidar_grupo(numeros, prefijo):
+    """normalizar_numero y es_numero_valido sobre una columna de números del mismo prefijo"""
+    troncal = TRONCALES[prefijo]
+    digitos = prefijo[1:]
+    # Las ramas de normalizar_numero de la menos a la más prioritaria: cada mask pisa a las anteriores
+    normalizados = prefijo + numeros
+    if troncal:
+        normalizados = normalizados.mask(numeros.str.startswith(troncal), prefijo + numeros.str[len(troncal):])
+    normalizados = normalizados.mask(numeros.str.startswith(digitos), "+" + numeros)
+    if troncal:
+        normalizados = normalizados.mask(numeros.str.startswith(troncal + digitos), "+" + numeros.str[len(troncal):])
+    normalizados = normalizados.mask(numeros.str.startswith(prefijo), numeros)
+
+    nacional = normalizados.str[len(prefijo):]
+    validos = normalizados.str.startswith(prefijo) & nacional.str.isdigit() & nacional.str.len().isin(LONGITUDES[prefijo])
+    return normalizados.where(validos)
+
+
+def revalidar_telefonos(numeros, paises, sectores):
+    """Versión vectorizada de revalidar_telefono para columnas enteras (nulo si el número no es válido)"""
+    numeros = numeros.astype(TIPO_TEXTO).str.replace(PATRON_SEPARADORES.pattern, '', regex=True)
+
+    # Prefijo del país de cada fila; los países desconocidos se resuelven una vez por término
+    prefijos = paises.map(PREFIJO_DE_PAIS)
+    sin_pais = prefijos.isna()
+    if sin_pais.any():
+        por_sector = {sector: prefijo_de_pais(None, sector) for sector in sectores[sin_pais].unique()}
+        prefijos = prefijos.mask(sin_pais, sectores.map(por_sector))
+    # Los prefijos más largos, al final, pisan a los más cortos
+    for prefijo in reversed(PREFIJOS_INTERNACIONALES):
+        prefijos = prefijos.mask(numeros.str.startswith(prefijo), prefijo)
+
+    resultado = pd.Series(pd.NA, index=numeros.index, dtype=numeros.dtype)
+    for prefijo in prefijos.unique():
+        mascara = (prefijos == prefijo).to_numpy()
+        resultado = resultado.mask(mascara, _revalidar_grupo(numeros[mascara], prefijo))
+    return resultado.mask(numeros == '', '')
+
+
+def leer_tandas(ruta, filas_por_tanda=FILAS_POR_TANDA):
+    """DataFrames de texto con las filas del Excel o CSV, sin cargar el fichero entero"""
+    if os.path.splitext(ruta)[1].lower() == ".csv":
+        yield from pd.read_csv(ruta, dtype=str, keep_default_na=False, encoding="utf-8-sig",
+                               chunksize=filas_por_tanda)
+        return
+
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        cabecera = [str(valor) for valor in next(filas)]
+        tanda = []
+        for fila in filas:
+            tanda.append(["" if valor is None else str(valor) for valor in fila])
+            if len(tanda) == filas_por_tanda:
+                yield pd.DataFrame(tanda, columns=cabecera, dtype=str)
+                tanda = []
+        if tanda:
+            yield pd.DataFrame(tanda, columns=cabecera, dtype=str)
+    finally:
+        libro.close()
+
+
+def revalidar_tanda(tanda):
+    """Revalida los teléfonos de una tanda y descarta las filas que se quedan sin contacto.
+
+    Devuelve la tanda limpia y el número de teléfonos corregidos y descartados.
+    """
+    faltan = [columna for columna in COLUMNAS if columna not in tanda.columns]
+    if faltan:
+        raise ValueError(f"faltan columnas en el fichero: {', '.join(faltan)}")
+
+    telefonos = tanda['Teléfono']
+    revalidados = revalidar_telefonos(telefonos, tanda['País'], tanda['Sector'])
+    invalidos = revalidados.isna()
+    corregidos = ~invalidos & (revalidados != telefonos)
+    tanda = tanda[COLUMNAS].assign(**{'Teléfono': revalidados.fillna('').astype(object)})
+    con_contacto = (tanda['Teléfono'] != '') | (tanda['Email'] != '')
+    return tanda[con_contacto], int(corregidos.sum()), int(invalidos.sum())
+
+
+def revalidar(ruta_entrada, ruta_salida, filas_por_tanda=FILAS_POR_TANDA):
+    """Revalida el fichero de entrada y escribe los leads únicos en ruta_salida (.xlsx, .csv o .parquet).
+
+    Devuelve un diccionario con las filas leídas, los teléfonos corregidos y
+    descartados, las filas sin contacto y los leads únicos escritos.
+    """
+    estadisticas = {'filas': 0, 'corregidos': 0, 'invalidos': 0, 'sin_contacto': 0, 'escritos': 0}
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(ruta_salida))) as directorio:
+        almacen = AlmacenLeads(os.path.join(directorio, "revalidacion.db"))
+        try:
+            for tanda in leer_tandas(ruta_entrada, filas_por_tanda):
+                limpia, corregidos, invalidos = revalidar_tanda(tanda)
+                almacen.agregar_lote(limpia.to_numpy(dtype=object).tolist())
+                estadisticas['filas'] += len(tanda)
+                estadisticas['corregidos'] += corregidos
+                estadisticas['invalidos'] += invalidos
+                estadisticas['sin_contacto'] += len(tanda) - len(limpia)
+                print(f"🧹 {estadisticas['filas']} filas revalidadas")
+            # La exportación vuelve a deduplicar por teléfono y email ya normalizados
+            estadisticas['escritos'] = almacen.exportar(ruta_salida)
+        finally:
+            almacen.cerrar()
+    return estadisticas
@@ -0,0 +1,60 @@
+import time
+from collections import defaultdict
+
+from instrumentacion import metricas
+
+INTERVALO_MINIMO = 3.0
+ESPERA_MAXIMA = 120.0
+
+
+class Ritmo:
+    """Planificador central de pausas entre peticiones a Google.
+
+    Garantiza un intervalo mínimo entre peticiones y lo amplía de forma
+    adaptativa cuando aparece un CAPTCHA o una página sin resultados,
+    reduciéndolo de nuevo a medida que las páginas se cargan con normalidad.
+    También acumula cuánto tiempo se ha pasado esperando en cada paso.
+    """
+
+    def __init__(self, intervalo_minimo=INTERVALO_MINIMO, factor=2.0, espera_maxima=ESPERA_MAXIMA):
+        self.intervalo_minimo = intervalo_minimo
+        self.factor = factor
+        self.espera_maxima = espera_maxima
+        self.espera_extra = 0.0
+        self.ultima_peticion = None
+        self.tiempo_por_paso = defaultdict(float)
+        self.esperas_por_paso = defaultdict(int)
+
+    def esperar(self, paso):
+        """Espera lo necesario antes de la siguiente petición y la marca como realizada"""
+        if self.ultima_peticion is not None:
+            restante = self.ultima_peticion + self.intervalo_minimo + self.espera_extra - time.monotonic()
+            if restante > 0:
+                time.sleep(restante)
+                self.registrar_espera(paso, restante)
+        self.ultima_peticion = time.monotonic()
+
+    def registrar_espera(self, paso, segundos):
+        self.tiempo_por_paso[paso] += segundos
+        self.esperas_por_paso[paso] += 1
+        metricas.observar(f"espera: {paso}", segundos)
+
+    def penalizar(self, motivo):
+        """Amplía el intervalo entre peticiones tras un CAPTCHA o una página vacía"""
+        base = self.espera_extra or max(self.intervalo_minimo, 1.0)
+        self.espera_extra = min(base * self.factor, self.espera_maxima)
+        metricas.contar("penalizaciones")
+        print(f"🐢 {motivo}: intervalo entre peticiones ampliado a "
+              f"{self.intervalo_minimo + self.espera_extra:.1f}s")
+
+    def recuperar(self):
+        """Reduce a la mitad la espera adicional tras una página correcta"""
+        self.espera_extra = self.espera_extra / 2 if self.espera_extra > 0.5 else 0.0
+
+    def resumen(self):
+        """Líneas con el tiempo total de espera por paso, de mayor a menor"""
+        pasos = sorted(self.tiempo_por_paso.items(), key=lambda paso: paso[1], reverse=True)
+        return [
+            f"{paso}: {segundos:.1f}s en {self.esperas_por_paso[paso]} esperas"
+            for paso, segundos in pasos
+        ]